@@ -1,119 +1,201 @@
-import matplotlib
-matplotlib.use('TkAgg')
-
 import argparse
-import pandas as pd
-import tkinter as tk
-from tkinter import ttk
-import os
-
-from src.graphs.acceleration_graph import AccelerationGraph
-from src.graphs.velocity_graph import VelocityGraph
-from src.graphs.tilt_graph import TiltGraph
-from src.graphs.gyro_graph import GyroGraph
-from src.graphs.gyro_state_graph import GyroStateGraph
-from src.graphs.rotation_graph import RotationGraph
-from src.graphs.kalman_graph import KalmanGraph
-from src.graphs.attitude_graph import AttitudeGraph
-from src.parse_data import parse_data
-
-
-def get_data(args: dict):
-	"""
-	Get data from binary files
-
-	Returns:
-		A DataFrame of the combined data
-	"""
-	script_dir = os.path.dirname(os.path.abspath(__file__))
-	data_csv_dir = os.path.join(script_dir, 'data_csv')
-
-	# TODO: currently will just read from csv
-	data = [
-		pd.read_csv(os.path.join(data_csv_dir, 'data_highres.csv')),
-		pd.read_csv(os.path.join(data_csv_dir, 'data_raven_highres.csv')),
-		pd.read_csv(os.path.join(data_csv_dir, 'data_lowres.csv')),
-		pd.read_csv(os.path.join(data_csv_dir, 'data_raven_lowres.csv')),
-		pd.read_csv(os.path.join(data_csv_dir, 'data_highres_2.csv'))
-	]
+import sys
 
-	parse_data(data, args)
+from src.lib.integrate import INTEGRATORS
+from src.loader import get_data
+from src.export import export_csv
+from src.batch import run_batch
+from src import instrument
 
-	return data
 
 # CLI
 def generate(args):
-    data = get_data(args)
-
-    output_dir = './data_csv'
-    os.makedirs(output_dir, exist_ok=True)
-
-    data[0].to_csv(os.path.join(output_dir, "data_highres.csv"), index=False)
-    data[1].to_csv(os.path.join(output_dir, "data_raven_highres.csv"), index=False)
-    data[2].to_csv(os.path.join(output_dir, "data_lowres.csv"), index=False)
-    data[3].to_csv(os.path.join(output_dir, "data_raven_lowres.csv"), index=False)
-    data[4].to_csv(os.path.join(output_dir, "data_highres_2.csv"), index=False)
-    data[5].to_csv(os.path.join(output_dir, "quaternion_estimate_AV.csv"), index=False)
-    data[6].to_csv(os.path.join(output_dir, "quaternion_estimate_BR.csv"), index=False)
-
-# UI
-class App(tk.Tk):
-	def __init__(self, args: dict):
-		super().__init__()
-
-		self.title("Data Visualisation")
-		self.protocol("WM_DELETE_WINDOW", self.on_close)
-		self.notebook = ttk.Notebook(self)
-		self.notebook.pack(fill=tk.BOTH, expand=1)
-
-		data = get_data(args)
-
-		self.tabs = [
-			AccelerationGraph(self.notebook, data, args),
-			VelocityGraph(self.notebook, data, args),
-			TiltGraph(self.notebook, data, args),
-			GyroGraph(self.notebook, data, args),
-			GyroStateGraph(self.notebook, data, args),
-			RotationGraph(self.notebook, data, args),
-			KalmanGraph(self.notebook, data, args),
-			AttitudeGraph(self.notebook, data, args, data_source='AV'),
-			AttitudeGraph(self.notebook, data, args, data_source='BR'),
-		]
-
-	def on_close(self):
-		self.destroy()
-		self.quit()
+    # exports keep every column, not just the ones the graphs read
+    data = get_data({**args, 'prune': False})
+
+    output_dir = args.get('output_dir') or './data_csv'
+    with instrument.span("export_csv"):
+        export_csv(data, output_dir, workers=args.get('workers'))
+
+def batch(args: dict):
+	run_batch(args['batch'], args['summary'], args, resume=args['resume'])
+
+def live(args: dict):
+	# tkinter and matplotlib are only imported once a window is needed
+	from src.live import live
+	live(args)
 
 def visualise(args: dict):
-	app = App(args)
-	app.mainloop()
-
-
-def main():
-	if False: # currently using test input
-		parser = argparse.ArgumentParser(description="Avionics Data Visualisation and CSV Generation")
-		parser.add_argument('--csv', action='store_true',
-			help="Generate CSV files from data")
-		parser.add_argument('data', type=str,
-			help='Path to the binary file to extract data from')
-		args = vars(parser.parse_args())
-	else:
-		args = {
-			"csv": False,
-			"data": "data.bin",
-
-			# rotation
-			"axisAV": "xyz[1,1,1]",
-			"axisBR": "xyz[1,1,1]",
-			"time": ["AV:0:-1","BR:10:-1"],
-			"freq": "1:1",
-		}
-
-	if args['csv']:
-		generate(args)
-	else:
-		visualise(args)
+	from src.app import visualise
+	visualise(args)
+
+def render(args: dict):
+	# matplotlib (Agg) and the graphs, but never tkinter
+	from src.render import render_report
+	results = render_report(args)
+	if any(result['status'] != 'ok' for result in results):
+		sys.exit(1)
+
+def animate(args: dict):
+	from src.animate import animate
+	animate(args)
+
+
+COMMANDS = {
+	'gui': visualise,
+	'export': generate,
+	'batch': batch,
+	'live': live,
+	'render': render,
+	'animate': animate,
+}
+
+# listed in --help, the graph modules that register them are only
+# imported by the commands that draw
+TAB_NAMES = "acceleration, velocity, tilt, gyro, gyro_state, rotation, kalman, attitude_av, attitude_br"
+
+# flags of earlier versions -> the command they select, and whether the
+# flag takes the command's path
+LEGACY_FLAGS = {
+	'--csv': ('export', False),
+	'--batch': ('batch', True),
+	'--live': ('live', True),
+}
+
+
+def command_argv(argv: list) -> list:
+	"""
+	Puts the command first, the GUI runs when none is given. The --csv,
+	--batch PATH and --live PATH flags of earlier versions still work.
+	"""
+	argv = list(argv)
+	for flag, (command, takes_path) in LEGACY_FLAGS.items():
+		if flag in argv:
+			i = argv.index(flag)
+			argv.pop(i)
+			if takes_path and i < len(argv):
+				argv.insert(0, argv.pop(i))
+			return [command, *argv]
+
+	if argv and (argv[0] in COMMANDS or argv[0] in ('-h', '--help')):
+		return argv
+	return ['gui', *argv]
+
+
+def build_parser() -> argparse.ArgumentParser:
+	# options shared by every command
+	common = argparse.ArgumentParser(add_help=False)
+	common.add_argument('--no-cache', dest='cache', action='store_false',
+		help="Bypass the parsed data cache")
+	common.add_argument('--clear-cache', action='store_true',
+		help="Remove all parsed data cache entries before loading")
+	common.add_argument('--cache-size', type=float, default=512,
+		help="Maximum size of the parsed data cache in MB (default: 512)")
+	common.add_argument('--gyro-bias', action='store_true',
+		help="Remove the gyro bias estimated on the pad before integrating")
+	common.add_argument('--integrator', choices=INTEGRATORS, default='half_euler',
+		help="Gyro integration method (default: half_euler)")
+	common.add_argument('--decimate', type=int, default=1,
+		help="Gyro samples combined into each integration step, e.g. 4 for 4:1 (default: 1)")
+	common.add_argument('--workers', type=int, default=None,
+		help="Number of worker processes for parallel work (default: all cores)")
+	common.add_argument('--profile', type=str, nargs='?', const=instrument.DEFAULT_TRACE_PATH, default=None, metavar='PATH',
+		help=f"Record stage timings and memory to a Chrome trace (default: {instrument.DEFAULT_TRACE_PATH}) and print a summary at exit")
+
+	parser = argparse.ArgumentParser(description="Avionics Data Visualisation and CSV Generation")
+	commands = parser.add_subparsers(dest='command', metavar='COMMAND',
+		help="gui (the default), export, render, animate, batch or live")
+
+	gui = commands.add_parser('gui', parents=[common],
+		help="Show the graphs")
+	gui.add_argument('data', type=str, nargs='?', default=None,
+		help='Path to a binary log to extract data from (default: the csv files in data_csv)')
+	gui.add_argument('--tabs', type=lambda value: value.split(','), default=None, metavar='NAME[,NAME...]',
+		help=f"Only show these tabs, and only load the data they need (default: all). {TAB_NAMES}")
+	gui.add_argument('--fps', type=float, default=60,
+		help="Display refresh rate the attitude animations are decimated to (default: 60)")
+	gui.add_argument('--playback-speed', type=float, default=1.0,
+		help="Attitude animation playback speed relative to real time (default: 1.0)")
+
+	export = commands.add_parser('export', parents=[common],
+		help="Generate CSV files from data")
+	export.add_argument('data', type=str, nargs='?', default=None,
+		help='Path to a binary log to extract data from (default: the csv files in data_csv)')
+	export.add_argument('--output-dir', type=str, default=None,
+		help="Directory the CSV files are generated in (default: ./data_csv)")
+
+	render = commands.add_parser('render', parents=[common],
+		help="Draw the graphs to image files without a window")
+	render.add_argument('data', type=str, nargs='?', default=None,
+		help='Path to a binary log to extract data from (default: the csv files in --data-dir)')
+	render.add_argument('--data-dir', type=str, default=None,
+		help="Directory of the csv files, e.g. one flight of a batch (default: ./data_csv)")
+	render.add_argument('--output-dir', type=str, default=None,
+		help="Directory the figures are written to, one file per tab and format (default: ./figures)")
+	render.add_argument('--format', dest='formats', type=lambda value: value.split(','), default=['png'], metavar='FORMAT[,FORMAT...]',
+		help="png, svg and/or pdf (default: png)")
+	render.add_argument('--dpi', type=float, default=150,
+		help="Figure resolution (default: 150)")
+	render.add_argument('--tabs', type=lambda value: value.split(','), default=None, metavar='NAME[,NAME...]',
+		help=f"Only draw these tabs, and only load the data they need (default: all). {TAB_NAMES}")
+
+	animate = commands.add_parser('animate', parents=[common],
+		help="Export the attitude animations to video (ffmpeg) or GIF files without a window")
+	animate.add_argument('data', type=str, nargs='?', default=None,
+		help='Path to a binary log to extract data from (default: the csv files in --data-dir)')
+	animate.add_argument('--data-dir', type=str, default=None,
+		help="Directory of the csv files, e.g. one flight of a batch (default: ./data_csv)")
+	animate.add_argument('--output-dir', type=str, default=None,
+		help="Directory the animations are written to as attitude_<source>.<format> (default: ./animations)")
+	animate.add_argument('--sources', type=lambda value: value.split(','), default=['AV', 'BR'], metavar='SOURCE[,SOURCE...]',
+		help="AV and/or BR (default: AV,BR)")
+	animate.add_argument('--format', choices=('mp4', 'gif'), default='mp4',
+		help="mp4 needs ffmpeg, a GIF is written without it (default: mp4)")
+	animate.add_argument('--fps', type=float, default=30,
+		help="Frame rate, samples are subsampled to it (default: 30)")
+	animate.add_argument('--playback-speed', type=float, default=1.0,
+		help="Playback speed relative to real time (default: 1.0)")
+	animate.add_argument('--dpi', type=float, default=100,
+		help="Frame resolution, frames are 6x4 inches (default: 100)")
+
+	batch = commands.add_parser('batch', parents=[common],
+		help="Analyse every flight in a directory (or listed in a manifest file) without the GUI")
+	batch.add_argument('batch', type=str, metavar='PATH',
+		help="Directory of flights, or a manifest file")
+	batch.add_argument('--summary', type=str, default='batch_summary.csv',
+		help="Batch summary csv, finished flights in it are skipped (default: batch_summary.csv)")
+	batch.add_argument('--no-resume', dest='resume', action='store_false',
+		help="Re-analyse every flight in a batch instead of resuming")
+
+	live = commands.add_parser('live', parents=[common],
+		help="Follow a log that is still being written")
+	live.add_argument('live', type=str, metavar='PATH',
+		help="Binary log, or AV or Blue Raven high-res csv")
+	live.add_argument('--refresh-ms', type=int, default=250,
+		help="Minimum time between live plot refreshes in ms (default: 250)")
+
+	return parser
+
+
+def main(argv: list | None = None):
+	parser = build_parser()
+	args = vars(parser.parse_args(command_argv(sys.argv[1:] if argv is None else argv)))
+
+	if args['profile']:
+		instrument.enable(args['profile'])
+
+	# currently using test input
+	args.update({
+		# rotation
+		"axisAV": "xyz[1,1,1]",
+		"axisBR": "xyz[1,1,1]",
+		# mission time windows (source:start:duration), 0 is liftoff
+		"time": ["AV:0:-1","BR:0:-1"],
+		"freq": "1:1",
+	})
+
+	COMMANDS[args['command']](args)
 
 
 if __name__ == "__main__":
-	main()
\ No newline at end of file
+	main()
@@ -0,0 +1,125 @@
+"""
+Checks that the headless commands stay fast to start.
+
+    python -m benchmarks.imports
+    python -m benchmarks.imports --budget-ms 600
+
+Each command runs in a fresh interpreter on a small synthetic flight. The
+run fails when importing avionics_data takes longer than the budget, or
+when a command loads a module it should not, e.g. tkinter for an export.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from .run import FLIGHTS_DIR
+from .synthetic import write_flight
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# loaded only by the GUI
+GUI_MODULES = ('tkinter', 'matplotlib', 'scipy', 'src.app', 'src.graph_tab', 'src.graphs')
+# loaded only when the Kalman filter is tuned
+OPTIMISER_MODULES = ('bayes_opt', 'sklearn')
+
+# command -> modules it must not import. Batch tunes the Kalman filter, so
+# the optimiser (which brings in scipy) is allowed there. Render draws with
+# and animate draw with matplotlib but must never need Tk.
+FORBIDDEN = {
+    'help': GUI_MODULES + OPTIMISER_MODULES,
+    'export': GUI_MODULES + OPTIMISER_MODULES,
+    'batch': ('tkinter', 'matplotlib', 'src.app', 'src.graph_tab', 'src.graphs'),
+    'render': ('tkinter', 'src.app') + OPTIMISER_MODULES,
+    'animate': ('tkinter', 'src.app') + OPTIMISER_MODULES,
+}
+
+# runs a command, then reports the import time and every loaded module
+RUNNER = """
+import json, sys, time
+start = time.perf_counter()
+import avionics_data
+seconds = time.perf_counter() - start
+try:
+    avionics_data.main(sys.argv[2:])
+except SystemExit:
+    pass
+with open(sys.argv[1], 'w') as f:
+    json.dump({'import_seconds': seconds, 'modules': sorted(sys.modules)}, f)
+"""
+
+
+def run_command(argv: list) -> dict:
+    """
+    Returns:
+        A dict of import_seconds and modules for one command
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        report = os.path.join(directory, 'report.json')
+        subprocess.run(
+            [sys.executable, '-c', RUNNER, report, *argv],
+            cwd=REPO_DIR, check=True, stdout=subprocess.DEVNULL
+        )
+        with open(report) as f:
+            return json.load(f)
+
+
+def forbidden_modules(modules: list, forbidden: tuple) -> list:
+    return [m for m in modules if any(m == f or m.startswith(f + '.') for f in forbidden)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the headless commands' import time and imports")
+    parser.add_argument('--budget-ms', type=float, default=800,
+        help="Longest allowed import of avionics_data in ms (default: 800)")
+    parser.add_argument('--repeat', type=int, default=3,
+        help="Runs of each command, the fastest import is used (default: 3)")
+    args = parser.parse_args()
+
+    flight = write_flight(FLIGHTS_DIR, 1)
+
+    with tempfile.TemporaryDirectory() as output:
+        # a batch of just this flight
+        manifest = os.path.join(output, 'flights.txt')
+        with open(manifest, 'w') as f:
+            f.write(flight + '\n')
+
+        commands = {
+            'help': ['--help'],
+            'export': ['export', '--output-dir', output, '--no-cache'],
+            'batch': ['batch', manifest, '--summary', os.path.join(output, 'summary.csv'), '--workers', '1', '--no-resume'],
+            # a quick tab, the Kalman tab would tune
+            'render': ['render', '--data-dir', flight, '--output-dir', output, '--tabs', 'tilt,attitude_av', '--workers', '1', '--no-cache'],
+            'animate': ['animate', '--data-dir', flight, '--output-dir', output, '--sources', 'AV', '--format', 'gif', '--fps', '2', '--workers', '1', '--no-cache'],
+        }
+
+        failures = []
+        print(f"{'command':<10}{'import ms':>12}  forbidden imports")
+        for name, argv in commands.items():
+            runs = [run_command(argv) for _ in range(args.repeat)]
+            import_ms = 1000 * min(run['import_seconds'] for run in runs)
+            loaded = forbidden_modules(runs[0]['modules'], FORBIDDEN[name])
+
+            # only top-level packages, their submodules add nothing
+            roots = sorted({m.split('.')[0] if not m.startswith('src.') else m for m in loaded})
+            print(f"{name:<10}{import_ms:>12.0f}  {', '.join(roots) or '-'}")
+
+            if import_ms > args.budget_ms:
+                failures.append(f"{name} imports in {import_ms:.0f} ms, over the {args.budget_ms:g} ms budget")
+            if loaded:
+                failures.append(f"{name} imports {', '.join(roots)}")
+
+    if failures:
+        print()
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+
+    print("\nAll commands within budget")
+
+
+if __name__ == "__main__":
+    main()
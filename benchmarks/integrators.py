@@ -0,0 +1,118 @@
+"""
+Compares the gyro integrators' accuracy against their cost.
+
+    python -m benchmarks.integrators                 # synthetic 1x flight
+    python -m benchmarks.integrators --scale 10 --decimate 1,4,16
+    python -m benchmarks.integrators --data-dir data_csv
+
+Every integrator is run on the Blue Raven high-res gyro at each
+decimation, filled back in to every sample like parse_data does, and
+compared with the Blue Raven's own quaternion (Quat_1..4) from liftoff on.
+Synthetic flights log their exact attitude there. For a real log the
+--axis mapping has to match the Blue Raven's quaternion frame for the
+errors to mean anything.
+
+On a synthetic flight the batch summary's attitude drift is checked too,
+and the run exits non-zero when it is above --max-drift.
+"""
+import argparse
+import json
+import os
+import sys
+
+from src.alignment import liftoff_index, sample_interval
+from src.batch import attitude_drift, attitude_error, blue_raven_attitude
+from src.calibration import scaled, parse_axis
+from src.lib.integrate import INTEGRATORS, integrate_gyro, upsample
+from src.loader import get_data
+
+from .run import ARGS, measure
+from .synthetic import synthetic_flight
+
+
+def evaluate(data_br, axis: str, method: str, decimate: int, repeat: int) -> dict:
+    """
+    Returns:
+        A dict of seconds, peak_mb and the max and final attitude error in
+        degrees
+    """
+    dt = sample_interval(data_br)
+    gyro = scaled(data_br, 'BR', 'gyro', *parse_axis(axis), debias=True)
+
+    def run():
+        quats = integrate_gyro(gyro, dt, method=method, decimate=decimate)
+        return upsample(quats, decimate, len(gyro))
+
+    result = measure(run, repeat)
+
+    error = attitude_error(run()[1:], blue_raven_attitude(data_br), liftoff_index(data_br))
+    result['max_error_deg'] = float(error.max())
+    result['final_error_deg'] = float(error[-1])
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare gyro integrator accuracy against cost")
+    parser.add_argument('--scale', type=float, default=1,
+        help="Synthetic flight size as a multiple of the current logs (default: 1)")
+    parser.add_argument('--data-dir', type=str, default=None,
+        help="Evaluate the csv files in this directory instead of a synthetic flight")
+    parser.add_argument('--axis', type=str, default=ARGS['axisBR'],
+        help=f"Blue Raven axis mapping (default: {ARGS['axisBR']})")
+    parser.add_argument('--decimate', type=str, default="1,2,4,8",
+        help="Comma separated decimation factors (default: 1,2,4,8)")
+    parser.add_argument('--repeat', type=int, default=3,
+        help="Timed runs per integrator, the best is reported (default: 3)")
+    parser.add_argument('--max-drift', type=float, default=0.5,
+        help="Largest batch attitude drift in degrees accepted on a synthetic flight (default: 0.5)")
+    parser.add_argument('--output', type=str, default=None,
+        help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    if args.data_dir:
+        data = get_data(dict(ARGS, data=None, data_dir=args.data_dir, cache=False), {'raven_highres': None})
+        name = args.data_dir
+    else:
+        data = synthetic_flight(args.scale)
+        name = f"synthetic {args.scale:g}x"
+
+    data_br = data['raven_highres']
+    print(f"{name}: {len(data_br)} Blue Raven samples")
+
+    results = {}
+    baseline = None
+    print(f"\n{'integrator':<20}{'seconds':>10}{'cost':>8}{'peak MB':>10}{'max err':>10}{'final err':>11}")
+    for method in INTEGRATORS:
+        for decimate in (int(k) for k in args.decimate.split(',')):
+            key = f"{method}:{decimate}"
+            result = evaluate(data_br, args.axis, method, decimate, args.repeat)
+            results[key] = result
+
+            # cost relative to the original full rate integrator
+            baseline = baseline or result['seconds']
+            print(
+                f"{key:<20}{result['seconds']:>10.4f}{result['seconds'] / baseline:>8.2f}{result['peak_mb']:>10.1f}"
+                f"{result['max_error_deg']:>10.4f}{result['final_error_deg']:>11.4f}"
+            )
+
+    print("\nErrors are degrees of attitude drift from the Blue Raven quaternion since liftoff")
+
+    # the synthetic attitude is exact, so the batch summary's drift must be close to zero
+    drift = None
+    if not args.data_dir:
+        drift = attitude_drift(data, ARGS)
+        print(f"Batch attitude drift: {drift:.4f} degrees (limit {args.max_drift:g})")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'flight': name, 'axis': args.axis, 'results': results, 'batch_drift_deg': drift}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if drift is not None and drift > args.max_drift:
+        print("Batch attitude drift is above the limit")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
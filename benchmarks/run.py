@@ -0,0 +1,359 @@
+"""
+Benchmarks the hot paths on synthetic flights.
+
+    python -m benchmarks.run                     # 1x, 10x and 100x
+    python -m benchmarks.run --scales 1,10 --save-baseline
+    python -m benchmarks.run --filter kalman
+
+Results are written as JSON and compared against the saved baseline, a
+benchmark slower than the baseline by more than --threshold is reported
+as a regression and makes the run exit non-zero.
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src.datasets import DATASETS, FlightData
+from src.loader import get_data
+from src.parse_data import parse_data
+from src.velocity import REQUIRES as KALMAN_REQUIRES
+from src.lib.integrate import integrate_gyro
+from src.lib.kalman import kalman_filter
+from src.lib.math import Quaternion, QuaternionArray, Vector3
+from src.calibration import scaled, parse_axis, G, FEET_PER_METRE
+from src.alignment import resample
+from src.derived import derived, invalidate
+from src.graphs.gyro_state_graph import GyroStateGraph
+from src.graphs.rotation_graph import RotationGraph
+
+from .synthetic import synthetic_flight, write_flight
+
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, 'results')
+FLIGHTS_DIR = os.path.join(BENCHMARK_DIR, 'flights')
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, 'baseline.json')
+
+ARGS = {
+    "axisAV": "xyz[1,1,1]",
+    "axisBR": "xyz[1,1,1]",
+    "freq": "1:1",
+}
+
+
+class Flight:
+    def __init__(self, scale: float, seed: int = 0):
+        """
+        A synthetic flight and the csv directory it was written to
+        """
+        self.scale = scale
+        self.directory = write_flight(FLIGHTS_DIR, scale, seed)
+        self.data = synthetic_flight(scale, seed)
+        parse_data(self.data, dict(ARGS))
+
+
+BENCHMARKS = []
+
+
+def benchmark(name: str):
+    """
+    Registers a benchmark. The decorated function does any setup for a
+    flight and returns the zero argument callable that is timed.
+    """
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+# MARK: benchmarks
+
+@benchmark("get_data.read_csv")
+def _read_csv(flight):
+    args = dict(ARGS, data=None, data_dir=flight.directory, cache=False)
+    return lambda: get_data(args)
+
+
+@benchmark("get_data.read_csv.kalman")
+def _read_csv_kalman(flight):
+    # a single analysis only reads and derives what it declares
+    args = dict(ARGS, data=None, data_dir=flight.directory, cache=False)
+    return lambda: get_data(args, KALMAN_REQUIRES)
+
+
+@benchmark("parse_data")
+def _parse_data(flight):
+    frames = {name: flight.data[name] for name in DATASETS}
+    def run():
+        parse_data(FlightData({name: df.copy() for name, df in frames.items()}), dict(ARGS))
+    return run
+
+
+@benchmark("parse_data.integrate_gyro")
+def _integrate_gyro(flight):
+    gyro = scaled(flight.data['raven_highres'], 'BR', 'gyro', *parse_axis(ARGS['axisBR']))
+    return lambda: integrate_gyro(gyro, 1.0)
+
+
+def _quaternions(flight, limit=None):
+    quats = flight.data['quaternions_AV'][["x", "y", "z", "w"]].to_numpy()
+    return quats if limit is None else quats[:limit]
+
+
+@benchmark("Quaternion.multiply")
+def _quaternion_multiply(flight):
+    quats = [Quaternion(*q) for q in _quaternions(flight)]
+    def run():
+        for a, b in zip(quats, quats[1:]):
+            a.multiply(b)
+    return run
+
+
+@benchmark("Quaternion.normalise")
+def _quaternion_normalise(flight):
+    quats = [Quaternion(*q) for q in _quaternions(flight)]
+    def run():
+        for q in quats:
+            q.normalise()
+    return run
+
+
+@benchmark("Quaternion.apply")
+def _quaternion_apply(flight):
+    quats = [Quaternion(*q) for q in _quaternions(flight)]
+    z = Vector3(0, 0, 1)
+    def run():
+        for q in quats:
+            q.apply(z)
+    return run
+
+
+@benchmark("Quaternion.with_half_euler")
+def _quaternion_with_half_euler(flight):
+    gyro = scaled(flight.data['highres'], 'AV', 'gyro').tolist()
+    def run():
+        for g in gyro:
+            Quaternion.with_half_euler(*g)
+    return run
+
+
+@benchmark("Quaternion.as_euler")
+def _quaternion_as_euler(flight):
+    quats = [Quaternion(*q) for q in _quaternions(flight)]
+    def run():
+        for q in quats:
+            q.as_euler(degrees=True)
+    return run
+
+
+@benchmark("QuaternionArray.multiply")
+def _quaternion_array_multiply(flight):
+    quats = QuaternionArray(_quaternions(flight))
+    return lambda: quats[:-1].multiply(quats[1:])
+
+
+@benchmark("QuaternionArray.as_euler")
+def _quaternion_array_as_euler(flight):
+    quats = QuaternionArray(_quaternions(flight))
+    return lambda: quats.as_euler(degrees=True)
+
+
+@benchmark("KalmanGraph.kalman_filter")
+def _kalman_filter(flight):
+    data = flight.data['highres_2']
+    accel_x = scaled(data, 'AV', 'accel')[:, 2]
+    z = np.column_stack([
+        resample(flight.data['raven_lowres'], "Baro_Altitude_AGL_(feet)", data),
+        FEET_PER_METRE * (data["Tilt_Cosine"].to_numpy() * accel_x - G)
+    ])
+    return lambda: kalman_filter(z, 0.004, (1.0, 1.0, 1.0), (1.0, 1.0))
+
+
+@benchmark("GyroStateGraph.compute")
+def _gyro_state(flight):
+    return lambda: GyroStateGraph.compute(flight.data, ARGS)
+
+
+def _derived(flight, name: str):
+    # dropping the memo first times the computation rather than the lookup
+    quats = flight.data['quaternions_AV']
+    def run():
+        invalidate(quats)
+        derived(quats, name)
+    return run
+
+
+@benchmark("derived.euler")
+def _derived_euler(flight):
+    return _derived(flight, 'euler')
+
+
+@benchmark("derived.rotation_matrices")
+def _derived_rotation_matrices(flight):
+    return _derived(flight, 'rotation_matrices')
+
+
+@benchmark("derived.tilt")
+def _derived_tilt(flight):
+    return _derived(flight, 'tilt')
+
+
+@benchmark("RotationGraph.compute")
+def _rotation(flight):
+    # the second run onwards shares the memoised Euler angles
+    args = dict(ARGS, time=["AV:0:-1", "BR:0:-1"])
+    return lambda: RotationGraph.compute(flight.data, args)
+
+
+# MARK: runner
+
+def measure(run, repeat: int) -> dict:
+    """
+    Times a callable and separately records its peak traced memory, so
+    tracing does not slow the timed runs.
+
+    Returns:
+        A dict of seconds (best), median and peak_mb
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    run()
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+
+    return {
+        'seconds': min(times),
+        'median': statistics.median(times),
+        'peak_mb': peak / (1024 * 1024),
+    }
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=BENCHMARK_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Prints each result against the baseline.
+
+    Returns:
+        The names of benchmarks slower than threshold times the baseline
+    """
+    regressions = []
+    print(f"\n{'benchmark':<48}{'baseline':>10}{'now':>10}{'ratio':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]['seconds']
+        ratio = result['seconds'] / max(before, 1e-12)
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<48}{before:>10.4f}{result['seconds']:>10.4f}{ratio:>8.2f}{flag}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the avionics data hot paths")
+    parser.add_argument('--scales', type=str, default="1,10,100",
+        help="Comma separated multiples of the current log sizes (default: 1,10,100)")
+    parser.add_argument('--repeat', type=int, default=3,
+        help="Timed runs per benchmark, the best is reported (default: 3)")
+    parser.add_argument('--filter', type=str, default=None,
+        help="Only run benchmarks whose name contains this")
+    parser.add_argument('--output', type=str, default=None,
+        help="Result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--baseline', type=str, default=DEFAULT_BASELINE,
+        help="Baseline to compare against (default: benchmarks/results/baseline.json)")
+    parser.add_argument('--save-baseline', action='store_true',
+        help="Also save these results as the baseline")
+    parser.add_argument('--threshold', type=float, default=1.25,
+        help="Slowdown ratio reported as a regression (default: 1.25)")
+    args = parser.parse_args()
+
+    selected = [
+        (name, setup) for name, setup in BENCHMARKS
+        if args.filter is None or args.filter.lower() in name.lower()
+    ]
+
+    results = {}
+    for scale in (float(s) for s in args.scales.split(',')):
+        print(f"Generating {scale:g}x flight")
+        flight = Flight(scale)
+
+        for name, setup in selected:
+            key = f"{name}@{scale:g}x"
+            result = measure(setup(flight), args.repeat)
+            results[key] = result
+            print(f"{key:<48}{result['seconds']:>10.4f}s{result['peak_mb']:>10.1f} MB")
+
+        del flight
+        gc.collect()
+
+    report = {
+        'meta': {
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'commit': _commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(RESULTS_DIR, datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    regressions = []
+    if os.path.exists(args.baseline) and os.path.abspath(args.baseline) != os.path.abspath(output):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"Comparing against {args.baseline} ({baseline['meta'].get('commit')})")
+        regressions = compare(results, baseline['results'], args.threshold)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.calibration import G, GYRO_SENSITIVITY, ACCEL_SENSITIVITY, FEET_PER_METRE
+from src.datasets import DATASETS, FlightData
+from src.lib.integrate import integrate_gyro
+
+
+# Bump when the generated data changes, so written flights are regenerated
+GENERATOR_VERSION = 4
+
+# Sizes of the current logs, a scale of 1 reproduces them
+AV_HIGHRES_ROWS = 13266
+AV_LOWRES_ROWS = 2654
+BR_HIGHRES_ROWS = 30740
+BR_LOWRES_ROWS = 3065
+
+AV_HIGHRES_DT = 0.004
+AV_LOWRES_DT = 0.020
+BR_HIGHRES_DT = 0.002
+BR_LOWRES_DT = 0.020
+BR_HIGHRES_START = -2.022
+BR_LOWRES_START = -1.9
+
+# Filler columns so the Blue Raven low-res csv is as wide as the real one
+BR_LOWRES_EXTRA_COLUMNS = 40
+
+
+# Flight events in seconds after liftoff, matching the current logs. Larger
+# scales record for longer, so the extra samples are descent and landed time.
+BURNOUT = 3.2
+APOGEE = 21.3
+DESCENT_RATE = 8.0
+
+
+def _profile(t: np.ndarray) -> tuple:
+    """
+    Vertical specific force, velocity and altitude of a simple flight:
+    a boost, an unpowered coast to apogee then a descent under a parachute
+    at a constant rate.
+
+    Returns:
+        A tuple of (specific force m/s^2, velocity m/s, altitude m) arrays
+    """
+    thrust = G * APOGEE / BURNOUT
+    burnout_velocity = (thrust - G) * BURNOUT
+    burnout_altitude = 0.5 * (thrust - G) * BURNOUT**2
+    top = burnout_altitude + burnout_velocity * (APOGEE - BURNOUT) - 0.5 * G * (APOGEE - BURNOUT)**2
+    landing = APOGEE + top / DESCENT_RATE
+
+    boost = (t >= 0) & (t < BURNOUT)
+    coast = (t >= BURNOUT) & (t < APOGEE)
+    descent = (t >= APOGEE) & (t < landing)
+    tb = np.clip(t, 0, None)
+    tc = t - BURNOUT
+
+    # specific force is what an accelerometer measures, 1 g at rest
+    force = np.select([boost, coast], [thrust, 0.0], G)
+    velocity = np.select([boost, coast, descent], [(thrust - G) * tb, burnout_velocity - G * tc, -DESCENT_RATE], 0.0)
+    altitude = np.select(
+        [boost, coast, descent],
+        [
+            0.5 * (thrust - G) * tb**2,
+            burnout_altitude + burnout_velocity * tc - 0.5 * G * tc**2,
+            top - DESCENT_RATE * (t - APOGEE)
+        ],
+        0.0
+    )
+
+    return force, velocity, altitude
+
+
+def _rates(t: np.ndarray) -> np.ndarray:
+    """
+    Body rates in degrees/s: a roll that spins up during boost and decays,
+    and a slow pitch over until apogee.
+
+    Returns:
+        An (N,3) array of (x, y, z) rates
+    """
+    tb = np.clip(t, 0, None)
+    flying = (t >= 0) & (t < APOGEE)
+    roll = np.where(t >= 0, 90.0 * np.clip(tb / BURNOUT, 0, 1) * np.exp(-tb / APOGEE), 0.0)
+    pitch = np.where(flying, 2.0 * np.sin(np.pi * tb / APOGEE), 0.0)
+    yaw = np.where(flying, 0.5, 0.0)
+
+    return np.column_stack([pitch, yaw, roll])
+
+
+# Sub-steps per sample when integrating the true attitude
+TRUTH_OVERSAMPLE = 16
+
+
+def _motion(t: np.ndarray, dt: float) -> tuple:
+    """
+    Gyro rates and true orientation at each sample. Like a real gyro each
+    rate is the average over the time step ending at its sample. The
+    orientation is integrated from _rates() with the exponential map at a
+    much finer step than the logs, so it does not share the error of any
+    integrator being evaluated against it.
+
+    Returns:
+        An (N,3) array of rates and an (N,4) array of (x, y, z, w)
+        quaternions
+    """
+    fine = dt / TRUTH_OVERSAMPLE
+    # midpoints of each sub-step, ending at every sample
+    t_fine = t[0] - dt + fine * (np.arange(len(t) * TRUTH_OVERSAMPLE) + 0.5)
+    rates_fine = _rates(t_fine)
+
+    rates = rates_fine.reshape(len(t), TRUTH_OVERSAMPLE, 3).mean(axis=1)
+    quats = integrate_gyro(rates_fine, fine, method='exp')[TRUTH_OVERSAMPLE::TRUTH_OVERSAMPLE]
+
+    return rates, quats
+
+
+def synthetic_flight(scale: float = 1, seed: int = 0) -> FlightData:
+    """
+    Builds AV and Blue Raven shaped datasets for a synthetic flight, as
+    get_data reads them from csv files.
+
+    Args:
+        scale (float): Multiple of the current log sizes
+        seed (int): Random seed for sensor noise
+    Returns:
+        FlightData of every dataset in DATASETS
+    """
+    rng = np.random.default_rng(seed)
+
+    # MARK: AV high-res (starts at liftoff)
+
+    rows = int(AV_HIGHRES_ROWS * scale)
+    t = AV_HIGHRES_DT * np.arange(rows)
+    force, _, _ = _profile(t)
+    rates, quats = _motion(t, AV_HIGHRES_DT)
+
+    accel = np.zeros((rows, 3))
+    accel[:, 0] = force  # logged x axis is vertical
+    accel_lsb = np.round(accel / (ACCEL_SENSITIVITY * G) + rng.normal(0, 2, (rows, 3)))
+    gyro_lsb = np.round(rates * GYRO_SENSITIVITY + rng.normal(0, 3, (rows, 3)))
+    mag = np.round(rng.normal(0, 20, (rows, 3)) + (5370, -900, -12))
+
+    tilt_cosine = 1 - 2 * (quats[:, 0]**2 + quats[:, 1]**2)
+
+    columns = {'sync': (np.arange(rows) * int(AV_HIGHRES_DT * 1000)) % 250}
+    for name, values in (('accel', accel_lsb), ('gyro', gyro_lsb), ('mag', mag)):
+        for i, axis in enumerate('xyz'):
+            columns[f"{name}_{axis}"] = values[:, i].astype(np.int16)
+    columns['Tilt_(degrees)'] = np.degrees(np.arccos(np.clip(tilt_cosine, -1.0, 1.0)))
+    columns['Tilt_Cosine'] = tilt_cosine
+
+    highres_2 = pd.DataFrame(columns)
+    # data_highres.csv capitalises the sensor columns
+    highres = highres_2.rename(columns={
+        f"{name}_{axis}": f"{name.capitalize()}_{axis.upper()}"
+        for name in ('accel', 'gyro', 'mag') for axis in 'xyz'
+    })
+
+    # MARK: AV low-res
+
+    rows = int(AV_LOWRES_ROWS * scale)
+    t = AV_LOWRES_DT * np.arange(rows)
+    _, _, altitude = _profile(t)
+    lowres = pd.DataFrame({
+        'sync': (np.arange(rows) * int(AV_LOWRES_DT * 1000)) % 250,
+        'pressure': np.round(101325 * (1 - 2.25577e-5 * altitude)**5.25588).astype(np.int64),
+        'temperature': np.round(2500 - 0.65 * altitude).astype(np.int64),
+    })
+
+    # MARK: Blue Raven high-res (starts before liftoff)
+
+    rows = int(BR_HIGHRES_ROWS * scale)
+    t = np.round(BR_HIGHRES_START + BR_HIGHRES_DT * np.arange(rows), 3)
+    force, _, _ = _profile(t)
+    rates, quats = _motion(t, BR_HIGHRES_DT)
+
+    raven_highres = pd.DataFrame({
+        'Year': 2024, 'Month': 4, 'Day': 14, 'Time': '15:32:07.948',
+        'Flight_Time_(s)': t,
+        'Sync': (np.arange(rows) * int(BR_HIGHRES_DT * 1000)) % 250,
+        'Gyro_X': np.round(rates[:, 0] + rng.normal(0, 0.05, rows), 1),
+        'Gyro_Y': np.round(rates[:, 1] + rng.normal(0, 0.05, rows), 1),
+        'Gyro_Z': np.round(rates[:, 2] + rng.normal(0, 0.05, rows), 1),
+        'Accel_X': np.round(force / G + rng.normal(0, 0.01, rows), 2),
+        'Accel_Y': np.round(rng.normal(0, 0.01, rows), 2),
+        'Accel_Z': np.round(rng.normal(0, 0.01, rows), 2),
+        # the derived quaternions read these as (-Quat_4, Quat_3, Quat_2, Quat_1)
+        'Quat_1': np.round(quats[:, 3], 5),
+        'Quat_2': np.round(quats[:, 2], 5),
+        'Quat_3': np.round(quats[:, 1], 5),
+        'Quat_4': np.round(-quats[:, 0], 5),
+        'Aux_Volts': 0.025,
+        'Current': 0.0,
+    })
+
+    # MARK: Blue Raven low-res
+
+    rows = int(BR_LOWRES_ROWS * scale)
+    t = np.round(BR_LOWRES_START + BR_LOWRES_DT * np.arange(rows), 2)
+    _, velocity, altitude = _profile(t)
+    altitude_feet = FEET_PER_METRE * altitude + rng.normal(0, 1.5, rows)
+
+    columns = {
+        'Year': 2024, 'Month': 4, 'Day': 14, 'Time': '15:12:38.183',
+        'Flight_Time_(s)': t,
+        'Sync': (np.arange(rows) * int(BR_LOWRES_DT * 1000)) % 250,
+        'Temperature_(F)': 89.6,
+        'Baro_Press_(atm)': np.round((1 - 2.25577e-5 * altitude)**5.25588, 4),
+        'Baro_Altitude_ASL_(feet)': np.round(altitude_feet + 170, 1),
+        'Baro_Altitude_AGL_(feet)': np.round(altitude_feet, 1),
+        'Batt_Volts': 8.96,
+        # the Blue Raven logs velocity in feet/s
+        'Velocity_Up': np.round(FEET_PER_METRE * velocity + rng.normal(0, 0.5, rows), 2),
+        'Velocity_DR': 0.0,
+    }
+    for i in range(BR_LOWRES_EXTRA_COLUMNS):
+        columns[f"Extra_{i}"] = 0
+    raven_lowres = pd.DataFrame(columns)
+
+    return FlightData(
+        highres=highres,
+        raven_highres=raven_highres,
+        lowres=lowres,
+        raven_lowres=raven_lowres,
+        highres_2=highres_2,
+    )
+
+
+def write_flight(directory: str, scale: float = 1, seed: int = 0) -> str:
+    """
+    Writes a synthetic flight as the csv files in a data_csv directory.
+    Flights already written with the same scale, seed and generator
+    version are reused.
+
+    Args:
+        directory (str): Parent directory for generated flights
+        scale (float): Multiple of the current log sizes
+        seed (int): Random seed for sensor noise
+    Returns:
+        The directory holding the csv files
+    """
+    path = os.path.join(directory, f"flight_v{GENERATOR_VERSION}_x{scale:g}_s{seed}")
+    if all(os.path.exists(os.path.join(path, name)) for name in DATASETS.values()):
+        return path
+
+    os.makedirs(path, exist_ok=True)
+    for dataset, df in synthetic_flight(scale, seed).items():
+        # data_highres_2.csv was written with its index
+        df.to_csv(os.path.join(path, DATASETS[dataset]), index=(dataset == 'highres_2'))
+
+    return path
@@ -0,0 +1,129 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from .lib.memo import frame_memo, frame_stamp
+
+
+# AV and Blue Raven sync counters are milliseconds modulo 250
+SYNC_MODULUS = 250
+
+
+def unwrap_counter(counter, modulus: int = SYNC_MODULUS) -> np.ndarray:
+    """
+    Unwraps a counter that rolls over at `modulus` into a monotonic count.
+
+    Args:
+        counter: Counter values in sample order
+        modulus (int): Value the counter wraps at
+    Returns:
+        A float64 array of the unwrapped count, starting at counter[0]
+    """
+    counter = np.asarray(counter, dtype=np.float64)
+    if len(counter) == 0:
+        return counter
+
+    steps = np.diff(counter)
+    steps[steps < 0] += modulus
+
+    unwrapped = np.empty_like(counter)
+    unwrapped[0] = counter[0]
+    np.cumsum(steps, out=unwrapped[1:])
+    unwrapped[1:] += counter[0]
+
+    return unwrapped
+
+
+def timebase(df: pd.DataFrame) -> np.ndarray:
+    """
+    Mission time in seconds for every row of a dataset, 0 at liftoff.
+
+    Blue Raven logs carry Flight_Time_(s). AV logs start at liftoff and are
+    timed from their unwrapped sync counter.
+
+    Args:
+        df (pd.DataFrame): The dataset
+    Returns:
+        A read-only float64 array, memoised per dataset
+    """
+    memo = frame_memo(df)
+    if 'timebase' not in memo:
+        if 'Flight_Time_(s)' in df:
+            t = df['Flight_Time_(s)'].to_numpy(dtype=np.float64)
+        elif 'Sync' in df or 'sync' in df:
+            sync = unwrap_counter(df['Sync' if 'Sync' in df else 'sync'].to_numpy())
+            t = (sync - sync[0]) / 1000.0
+        else:
+            raise KeyError("dataset has no Flight_Time_(s) or sync column to build a timebase from")
+        t.flags.writeable = False
+        memo['timebase'] = t
+
+    return memo['timebase']
+
+
+def estimate_timebase(df: pd.DataFrame) -> np.ndarray:
+    """
+    Mission time for quaternion estimates integrated from a dataset, which
+    have one more row (the initial orientation) than the dataset.
+    """
+    memo = frame_memo(df)
+    if 'estimate_timebase' not in memo:
+        t = timebase(df)
+        t = np.concatenate([t[:1], t])
+        t.flags.writeable = False
+        memo['estimate_timebase'] = t
+
+    return memo['estimate_timebase']
+
+
+def liftoff_index(df: pd.DataFrame) -> int:
+    """
+    Index of the first sample at or after liftoff.
+    """
+    return int(np.searchsorted(timebase(df), 0.0))
+
+
+def estimate_liftoff_index(df: pd.DataFrame) -> int:
+    """
+    Index of the first row at or after liftoff of a quaternion estimate
+    integrated from the dataset, see estimate_timebase.
+    """
+    return int(np.searchsorted(estimate_timebase(df), 0.0))
+
+
+def sample_interval(df: pd.DataFrame) -> float:
+    """
+    The dataset's sample interval in seconds, the median step of its
+    timebase so dropped samples do not skew it
+    """
+    t = timebase(df)
+    return float(np.median(np.diff(t))) if len(t) > 1 else 0.0
+
+
+def resample(source: pd.DataFrame, column: str, target: pd.DataFrame) -> np.ndarray:
+    """
+    Linearly interpolates a channel onto another dataset's clock. Each
+    (source, column, target) alignment is computed once and shared, and
+    recomputed when either dataset's stamp changes.
+
+    Args:
+        source (pd.DataFrame): Dataset the channel is logged in
+        column (str): Channel to resample
+        target (pd.DataFrame): Dataset whose clock the result follows
+    Returns:
+        A read-only float64 array with one value per row of target
+    """
+    memo = frame_memo(target)
+    key = ('resample', id(source), column)
+    entry = memo.get(key)
+    if entry is None or entry[0]() is not source or entry[1] != frame_stamp(source):
+        values = np.interp(
+            timebase(target),
+            timebase(source),
+            source[column].to_numpy(dtype=np.float64)
+        )
+        values.flags.writeable = False
+        entry = memo[key] = (weakref.ref(source), frame_stamp(source), values)
+
+    return entry[2]
@@ -0,0 +1,265 @@
+import matplotlib
+matplotlib.use('Agg')
+
+import os
+import shutil
+import subprocess
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from PIL import Image
+
+from .datasets import merge_requirements
+from .graphs.attitude_graph import AttitudeGraph, INTERVAL_MS, frame_indices
+from .loader import get_data
+from . import instrument
+
+
+FORMATS = ('mp4', 'gif')
+DEFAULT_FPS = 30
+DEFAULT_DPI = 100
+# frames rendered per task, small so every worker stays busy until the end
+CHUNK_FRAMES = 16
+# chunks in flight per worker, bounds the frames held in memory
+QUEUE_PER_WORKER = 4
+
+# the attitude figure a worker process draws its frames on, and the
+# rendered axes its moving artists are drawn over
+_worker_tab = None
+_worker_background = None
+# shared GIF palette, None when streaming raw RGB
+_worker_palette = None
+
+
+def _moving_artists(tab: AttitudeGraph) -> tuple:
+    return (tab.xaxis_q, tab.yaxis_q, tab.zaxis_q, tab.time_label)
+
+
+def _init_worker(result: dict, data_source: str, dpi: float, palette: Image.Image | None = None, profile: tuple | None = None):
+    global _worker_tab, _worker_background, _worker_palette
+    instrument.init_worker(profile)
+    tab = AttitudeGraph(None, {}, data_source=data_source)
+    canvas = FigureCanvasAgg(tab.create_figure(dpi))
+    tab.draw_axes(result)
+
+    # the axes are drawn once, each frame only draws the body axes and label
+    for artist in _moving_artists(tab):
+        artist.set_animated(True)
+    canvas.draw()
+
+    _worker_tab = tab
+    _worker_background = canvas.copy_from_bbox(tab.fig.bbox)
+    _worker_palette = palette
+
+
+def _frame(i: int) -> np.ndarray:
+    tab = _worker_tab
+    tab._update_frame(i)
+
+    canvas = tab.fig.canvas
+    canvas.restore_region(_worker_background)
+    # _update_frame projected the body axes for the current view
+    for artist in _moving_artists(tab):
+        tab.ax.draw_artist(artist)
+
+    return np.asarray(canvas.buffer_rgba())[:, :, :3]
+
+
+def _render_chunk(indices: list) -> tuple:
+    """
+    Returns:
+        The frames as raw RGB24, or as palette indices (one byte per
+        pixel) when a palette was given, and the spans recorded rendering
+        them
+    """
+    chunks = []
+    with instrument.span("export_animation.chunk", frames=len(indices)):
+        for i in indices:
+            rgb = _frame(i)
+            if _worker_palette is None:
+                chunks.append(rgb.tobytes())
+            else:
+                chunks.append(Image.fromarray(rgb).quantize(palette=_worker_palette, dither=Image.Dither.NONE).tobytes())
+
+    return b''.join(chunks), instrument.collect()
+
+
+def _write_chunk(writer, future_result: tuple):
+    frames, events = future_result
+    instrument.merge(events)
+    writer.write(frames)
+
+
+def _palette(rgb: np.ndarray) -> Image.Image:
+    """
+    Returns:
+        A 'P' image with a full 256 colour palette for the colours of a frame
+    """
+    palette = Image.fromarray(rgb).quantize(256)
+    colours = palette.getpalette()[:768]
+    # repeat the last colour, so every frame has the same full colour table
+    palette.putpalette(colours + colours[-3:] * (256 - len(colours) // 3))
+    return palette
+
+
+class FfmpegWriter:
+    def __init__(self, path: str, size: tuple, fps: float):
+        """
+        Encodes raw RGB24 frames piped to ffmpeg
+
+        Args:
+            path (str): Output video, the container follows the extension
+            size (tuple): Frame width and height in pixels
+            fps (float): Frame rate
+        """
+        width, height = size
+        self.process = subprocess.Popen([
+            shutil.which('ffmpeg'), '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f"{width}x{height}", '-r', f"{fps:g}", '-i', '-',
+            # yuv420p needs even dimensions
+            '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', path,
+        ], stdin=subprocess.PIPE)
+
+    def write(self, frames: bytes):
+        self.process.stdin.write(frames)
+
+    def close(self):
+        self.process.stdin.close()
+        if self.process.wait():
+            raise RuntimeError(f"ffmpeg exited with status {self.process.returncode}")
+
+
+class GifWriter:
+    def __init__(self, path: str, palette: Image.Image, size: tuple, duration: int):
+        """
+        Collects palette frames and saves them as a looping GIF on close.
+        Unlike the ffmpeg stream every frame is held until then, at one
+        byte per pixel. Every frame uses the global palette
+
+        Args:
+            path (str): Output GIF
+            palette (Image.Image): 'P' image whose palette every frame uses
+            size (tuple): Frame width and height in pixels
+            duration (int): Frame duration in ms
+        """
+        self.path = path
+        self.colours = palette.getpalette()
+        self.size = size
+        self.duration = duration
+        self.frames = []
+
+    def write(self, frames: bytes):
+        frame_bytes = self.size[0] * self.size[1]
+        for start in range(0, len(frames), frame_bytes):
+            image = Image.frombytes('P', self.size, frames[start:start + frame_bytes])
+            image.putpalette(self.colours)
+            self.frames.append(image)
+
+    def close(self):
+        if self.frames:
+            self.frames[0].save(
+                self.path, save_all=True, append_images=self.frames[1:],
+                duration=self.duration, loop=0, optimize=False
+            )
+        self.frames = []
+
+
+def export_animation(result: dict, data_source: str, path: str, fps: float = DEFAULT_FPS, playback_speed: float = 1.0,
+        dpi: float = DEFAULT_DPI, workers: int | None = None) -> str:
+    """
+    Renders an attitude animation to a file. Samples are subsampled to the
+    frame rate, the frames are split across worker processes drawing with
+    Agg from the precomputed rotations, and streamed in order to ffmpeg as
+    raw RGB, or to a GIF when the path ends in .gif or ffmpeg is missing.
+
+    Args:
+        result (dict): AttitudeGraph.compute() result
+        data_source (str): 'AV' or 'BR'
+        path (str): Output file, e.g. attitude_BR.mp4
+        fps (float): Frame rate of the file
+        playback_speed (float): Multiple of real time
+        dpi (float): Frame resolution, frames are 6x4 inches
+        workers (int | None): Worker processes (default: all cores)
+    Returns:
+        The path written
+    """
+    if len(result['rotations']) == 0:
+        raise ValueError(f"No rotations to animate for {data_source}")
+
+    gif = path.lower().endswith('.gif')
+    if not gif and shutil.which('ffmpeg') is None:
+        path = os.path.splitext(path)[0] + '.gif'
+        gif = True
+        print(f"ffmpeg not found, writing a GIF to {path}")
+
+    indices = list(frame_indices(len(result['rotations']), INTERVAL_MS[data_source], fps, playback_speed))
+    chunks = [indices[i:i + CHUNK_FRAMES] for i in range(0, len(indices), CHUNK_FRAMES)]
+
+    # the first frame sets the size and the GIF palette, the colours are
+    # the same throughout: the axes, the three body axes and the label
+    _init_worker(result, data_source, dpi)
+    first = _frame(indices[0])
+    size = (first.shape[1], first.shape[0])
+    palette = _palette(first) if gif else None
+    # GIF delays are in 1/100 s, and viewers slow anything under 2/100 s down
+    duration = 10 * max(2, round(100 / fps))
+
+    writer = GifWriter(path, palette, size, duration) if gif else FfmpegWriter(path, size, fps)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(chunks)))
+
+    start = time.perf_counter()
+    with instrument.span(f"export_animation.{data_source}", frames=len(indices), workers=workers):
+        try:
+            if workers == 1:
+                _init_worker(result, data_source, dpi, palette)
+                for chunk in chunks:
+                    _write_chunk(writer, _render_chunk(chunk))
+            else:
+                with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(result, data_source, dpi, palette, instrument.worker_state())) as pool:
+                    # submitted a few chunks ahead and written in order
+                    pending = deque()
+                    for chunk in chunks:
+                        pending.append(pool.submit(_render_chunk, chunk))
+                        if len(pending) >= workers * QUEUE_PER_WORKER:
+                            _write_chunk(writer, pending.popleft().result())
+                    while pending:
+                        _write_chunk(writer, pending.popleft().result())
+        finally:
+            writer.close()
+
+    print(f"{len(indices)} frames written to {path} in {time.perf_counter() - start:.2f} s")
+
+    return path
+
+
+def animate(args: dict) -> list:
+    """
+    Exports the attitude animation of each of args['sources'] to
+    args['output_dir'] as attitude_<source>.<format>
+
+    Returns:
+        The paths written
+    """
+    sources = args.get('sources') or ['AV', 'BR']
+    unknown = [source for source in sources if source not in INTERVAL_MS]
+    if unknown:
+        raise SystemExit(f"Unknown source(s) {', '.join(unknown)}, choose from {', '.join(INTERVAL_MS)}")
+
+    output_dir = args.get('output_dir') or './animations'
+    os.makedirs(output_dir, exist_ok=True)
+
+    data = get_data(args, merge_requirements(*(AttitudeGraph.requirements(data_source=source) for source in sources)))
+
+    paths = []
+    for source in sources:
+        result = AttitudeGraph.compute(data, args, data_source=source)
+        paths.append(export_animation(
+            result, source, os.path.join(output_dir, f"attitude_{source}.{args.get('format') or 'mp4'}"),
+            fps=args.get('fps') or DEFAULT_FPS, playback_speed=args.get('playback_speed') or 1.0,
+            dpi=args.get('dpi') or DEFAULT_DPI, workers=args.get('workers')
+        ))
+
+    return paths
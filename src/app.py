@@ -0,0 +1,130 @@
+import matplotlib
+matplotlib.use('TkAgg')
+
+import tkinter as tk
+from tkinter import ttk
+import os
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+
+# importing the graphs registers their tabs
+from . import graphs  # noqa: F401
+from .graph_tab import TABS, init_compute_worker, run_compute
+from .datasets import merge_requirements
+from .loader import get_data
+from . import instrument
+
+
+# how often the App checks for finished analyses
+POLL_MS = 50
+
+
+class TabFrame(ttk.Frame):
+	def __init__(self, parent: ttk.Notebook, tab):
+		"""
+		Adds a placeholder tab, the graph is only drawn by load() when the
+		tab is first shown
+
+		Args:
+			parent (ttk.Notebook): The parent notebook
+			tab (GraphTab): The analysis shown in the tab
+		"""
+		super().__init__(parent)
+		self.tab = tab
+		self.loaded = False
+
+		parent.add(self, text=tab.title)
+		self.placeholder = ttk.Label(self, text="Loading...", anchor=tk.CENTER)
+		self.placeholder.pack(fill=tk.BOTH, expand=1)
+
+	def load(self):
+		"""
+		Draws the graph once, from the App's compute result when there is
+		one, otherwise computing it here
+		"""
+		if self.loaded or not self.tab.ready():
+			return
+		self.loaded = True
+		self.update_idletasks()
+
+		tab = self.tab
+		with instrument.span(f"{tab.title}.load"):
+			tab.create_figure()
+			tab.graph()
+
+			self.placeholder.destroy()
+			canvas = FigureCanvasTkAgg(tab.fig, master=self)
+			toolbar = NavigationToolbar2Tk(canvas, self)
+			toolbar.update()
+
+			with instrument.span(f"{tab.title}.draw"):
+				canvas.draw()
+			canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+			toolbar.pack(side=tk.BOTTOM, fill=tk.X)
+
+
+class App(tk.Tk):
+	def __init__(self, args: dict):
+		super().__init__()
+
+		self.title("Data Visualisation")
+		self.protocol("WM_DELETE_WINDOW", self.on_close)
+		self.notebook = ttk.Notebook(self)
+		self.notebook.pack(fill=tk.BOTH, expand=1)
+
+		# only what the shown tabs need is loaded
+		tabs = [TABS[name] for name in args.get('tabs') or TABS]
+		data = get_data(args, merge_requirements(*(cls.requirements(**options) for cls, options in tabs)))
+
+		self.pool = None
+		self.tabs = [cls(data, args, **options) for cls, options in tabs]
+		self.frames = [TabFrame(self.notebook, tab) for tab in self.tabs]
+		self.after_idle(self.start_computes, data, args)
+
+	def start_computes(self, data: dict, args: dict):
+		"""
+		Runs every tab's analysis in parallel on a process pool once the
+		window is up. Tabs draw their result when they are shown.
+		"""
+		workers = max(1, min(args.get('workers') or os.cpu_count() or 1, len(self.tabs)))
+		# the pool already uses the cores, and the cache was cleared by get_data
+		worker_args = dict(args, workers=1, clear_cache=False)
+
+		# a single worker would only add the pickling, tabs then compute when shown
+		if workers > 1:
+			self.pool = ProcessPoolExecutor(workers, initializer=init_compute_worker, initargs=(data, worker_args, instrument.worker_state()))
+			for tab in self.tabs:
+				tab.future = self.pool.submit(run_compute, type(tab), tab.options, tab.title)
+
+		self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+		self.poll()
+
+	def poll(self):
+		# the shown tab draws as soon as its result arrives
+		self.on_tab_changed(None)
+
+		if all(tab.ready() for tab in self.tabs):
+			if self.pool is not None:
+				self.pool.shutdown(wait=False)
+		else:
+			self.after(POLL_MS, self.poll)
+
+	def on_tab_changed(self, event):
+		# tabs render their graphs the first time they are shown
+		frame = self.notebook.nametowidget(self.notebook.select())
+		frame.load()
+
+	def on_close(self):
+		if self.pool is not None:
+			self.pool.shutdown(wait=False, cancel_futures=True)
+		self.destroy()
+		self.quit()
+
+
+def visualise(args: dict):
+	unknown = [name for name in args.get('tabs') or () if name not in TABS]
+	if unknown:
+		raise SystemExit(f"Unknown tab(s) {', '.join(unknown)}, choose from {', '.join(TABS)}")
+
+	app = App(args)
+	app.mainloop()
@@ -0,0 +1,273 @@
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .alignment import timebase, liftoff_index, sample_interval
+from .cache import DataCache
+from .calibration import scaled, parse_axis
+from .datasets import axis_columns, merge_requirements
+from .derived import derived
+from .lib.integrate import integrate_gyro, upsample
+from .lib.math import QuaternionArray
+from .loader import get_data
+from .velocity import REQUIRES as KALMAN_REQUIRES, kalman_velocity
+from . import instrument
+
+
+# summary columns, in order. Velocities are feet/s like the Blue Raven's.
+SUMMARY_FIELDS = (
+    'flight',
+    'status',
+    'apogee_ft',
+    'max_velocity_fps',
+    'max_velocity_br_fps',
+    'velocity_rmse_fps',
+    'attitude_drift_deg',
+    'accel_rmse_ms2',
+    'seconds',
+)
+
+BINARY_LOG_NAME = 'data.bin'
+
+# datasets, columns and products analyse_flight reads
+REQUIRES = merge_requirements(KALMAN_REQUIRES, {
+    'highres': ('sync', *axis_columns('Accel')),
+    'raven_highres': ('Flight_Time_(s)', *axis_columns('Accel'), *axis_columns('Gyro'), 'Quat_1', 'Quat_2', 'Quat_3', 'Quat_4'),
+    'raven_lowres': ('Flight_Time_(s)', 'Baro_Altitude_AGL_(feet)', 'Velocity_Up'),
+})
+
+
+def find_flights(path: str) -> list:
+    """
+    Lists the flights to analyse. A directory is searched for flight
+    directories (each laid out like data_csv, optionally with a data.bin),
+    a file is read as a manifest of flight directories, one per line,
+    relative to the manifest. Blank lines and lines starting with # are
+    skipped.
+
+    Returns:
+        A sorted list of (name, directory) tuples
+    """
+    if os.path.isdir(path):
+        directories = [
+            os.path.join(path, name) for name in os.listdir(path)
+            if os.path.isdir(os.path.join(path, name))
+        ]
+        # a single flight directory can be given directly
+        if not directories:
+            directories = [path]
+    else:
+        base = os.path.dirname(os.path.abspath(path))
+        with open(path) as f:
+            lines = [line.strip() for line in f]
+        directories = [
+            os.path.join(base, line) for line in lines
+            if line and not line.startswith('#')
+        ]
+
+    flights = [(os.path.basename(os.path.normpath(d)), d) for d in directories]
+    return sorted(flights)
+
+
+def _rmse(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.sqrt(np.nanmean((a - b)**2)))
+
+
+def _conjugate(quats: np.ndarray) -> np.ndarray:
+    return quats * (-1, -1, -1, 1)
+
+
+def blue_raven_attitude(data_br) -> np.ndarray:
+    """
+    Returns:
+        The Blue Raven's own orientation as (N,4) (x, y, z, w) quaternions
+    """
+    return derived(data_br, 'quaternions')
+
+
+def attitude_error(estimate: np.ndarray, truth: np.ndarray, reference: int = 0) -> np.ndarray:
+    """
+    Angle in degrees that an estimated attitude has drifted from the truth
+    since the reference sample. Any fixed offset between the two frames
+    cancels out.
+
+    Args:
+        estimate (np.ndarray): (N,4) (x, y, z, w) quaternions
+        truth (np.ndarray): (N,4) (x, y, z, w) quaternions at the same samples
+        reference (int): Sample the two are aligned at
+    Returns:
+        An array of the angles from the reference sample on
+    """
+    # rotation between the two frames at each sample
+    error = QuaternionArray(estimate[reference:]).multiply(QuaternionArray(_conjugate(truth[reference:]))).normalise()
+    drift = error.multiply(QuaternionArray(_conjugate(error.data[:1])))
+
+    return np.degrees(2 * np.arccos(np.clip(np.abs(drift.w), 0.0, 1.0)))
+
+
+def attitude_drift(data: dict, args: dict) -> float:
+    """
+    Angle in degrees that the gyro integrated Blue Raven attitude has
+    drifted from the Blue Raven's own quaternion between liftoff and the
+    end of the log. The gyro is integrated at the log's own sample
+    interval rather than the freq the graphs use.
+
+    Args:
+        data (dict): FlightData with raven_highres
+        args (dict): Command line args (axisBR, gyro_bias, integrator, decimate)
+    """
+    data_br = data['raven_highres']
+    gyro = scaled(data_br, 'BR', 'gyro', *parse_axis(args['axisBR']), debias=args.get('gyro_bias', False))
+    decimate = args.get('decimate', 1)
+    estimate = integrate_gyro(gyro, sample_interval(data_br), method=args.get('integrator', 'half_euler'), decimate=decimate)
+    estimate = upsample(estimate, decimate, len(gyro))[1:]
+    truth = blue_raven_attitude(data_br)
+
+    ends = [liftoff_index(data_br), len(truth) - 1]
+    return float(attitude_error(estimate[ends], truth[ends])[-1])
+
+
+def analyse_flight(name: str, directory: str, args: dict) -> dict:
+    """
+    Loads and analyses one flight: gyro integration (parse_data), the
+    Kalman velocity estimate and the AV against Blue Raven comparisons.
+
+    Returns:
+        A summary row, see SUMMARY_FIELDS
+    """
+    start = time.perf_counter()
+
+    binary = os.path.join(directory, BINARY_LOG_NAME)
+    data = get_data(dict(args, data=binary if os.path.exists(binary) else None, data_dir=directory), REQUIRES)
+
+    kalman = kalman_velocity(data, args)
+
+    # Blue Raven velocity on the Kalman estimate's (AV) clock
+    t_br = timebase(data['raven_lowres'])
+    velocity_br = data['raven_lowres']["Velocity_Up"].to_numpy(dtype=np.float64)
+    flying = kalman['t'] >= 0
+    truth = np.interp(kalman['t'], t_br, velocity_br)
+
+    # vertical (logged x) acceleration from both sources on the AV clock
+    accel = scaled(data['highres'], 'AV', 'accel')[:, 2]
+    accel_br = np.interp(timebase(data['highres']), timebase(data['raven_highres']), scaled(data['raven_highres'], 'BR', 'accel')[:, 2])
+
+    return {
+        'flight': name,
+        'status': 'ok',
+        'apogee_ft': float(data['raven_lowres']["Baro_Altitude_AGL_(feet)"].max()),
+        'max_velocity_fps': float(np.max(kalman['velocity'])),
+        'max_velocity_br_fps': float(np.max(velocity_br)),
+        'velocity_rmse_fps': _rmse(kalman['velocity'][flying], truth[flying]),
+        'attitude_drift_deg': attitude_drift(data, args),
+        'accel_rmse_ms2': _rmse(accel, accel_br),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def _run(name: str, directory: str, args: dict) -> dict:
+    try:
+        row = analyse_flight(name, directory, args)
+    except Exception as e:
+        # recorded so the summary shows it, and retried on the next run
+        row = {'flight': name, 'status': f"error: {type(e).__name__}: {e}"}
+
+    # spans recorded in a worker process are sent back with the row
+    row['events'] = instrument.collect()
+    return row
+
+
+def _finished(summary_path: str) -> dict:
+    """
+    Returns:
+        The rows of flights already analysed successfully, by flight name
+    """
+    if not os.path.exists(summary_path):
+        return {}
+
+    with open(summary_path, newline='') as f:
+        return {row['flight']: row for row in csv.DictReader(f) if row['status'] == 'ok'}
+
+
+# longer values (error messages) are cut short in the printed table
+TABLE_WIDTH = 40
+
+
+def _print_table(rows: list):
+    widths = {field: max(len(field), *(len(_format(row.get(field))) for row in rows)) for field in SUMMARY_FIELDS}
+    print("  ".join(field.ljust(widths[field]) for field in SUMMARY_FIELDS))
+    for row in rows:
+        print("  ".join(_format(row.get(field)).ljust(widths[field]) for field in SUMMARY_FIELDS))
+
+
+def _format(value) -> str:
+    if value is None:
+        return ""
+    try:
+        return f"{float(value):.3f}"
+    except ValueError:
+        return str(value)[:TABLE_WIDTH]
+
+
+def run_batch(path: str, summary_path: str, args: dict, resume: bool = True) -> list:
+    """
+    Analyses every flight on a process pool and appends a summary row as
+    each one finishes, so an interrupted run resumes after the last
+    finished flight. Failed flights are recorded and retried next time.
+
+    Args:
+        path (str): Directory of flights, or a manifest file
+        summary_path (str): Summary csv
+        args (dict): Command line args
+        resume (bool): Skip flights already in the summary
+    Returns:
+        The summary rows of every flight, sorted by name
+    """
+    # workers must not clear the cache, so it is done once here
+    DataCache.from_args(args)
+
+    flights = find_flights(path)
+    done = _finished(summary_path) if resume else {}
+    pending = [(name, directory) for name, directory in flights if name not in done]
+
+    # keep only finished rows, failed flights are about to be retried
+    with open(summary_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(done.values())
+
+    print(f"{len(flights)} flights, {len(done)} already analysed, {len(pending)} to run")
+
+    workers = max(1, min(args.get('workers') or os.cpu_count() or 1, len(pending) or 1))
+    # flights run in parallel, so each one tunes on a single process
+    worker_args = dict(args, workers=1, clear_cache=False)
+
+    rows = list(done.values())
+    with open(summary_path, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+
+        def finish(row):
+            instrument.merge(row.pop('events'))
+            writer.writerow(row)
+            f.flush()
+            rows.append(row)
+            print(f"[{len(rows)}/{len(flights)}] {row['flight']}: {row['status']}")
+
+        if workers == 1:
+            for name, directory in pending:
+                finish(_run(name, directory, worker_args))
+        else:
+            with ProcessPoolExecutor(workers, initializer=instrument.init_worker, initargs=(instrument.worker_state(),)) as pool:
+                futures = [pool.submit(_run, name, directory, worker_args) for name, directory in pending]
+                for future in as_completed(futures):
+                    finish(future.result())
+
+    rows.sort(key=lambda row: row['flight'])
+    print()
+    _print_table(rows)
+    print(f"\nSummary written to {summary_path}")
+
+    return rows
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+
+# This repo's own container for AV logs, not the flight computer's native
+# format, whose frame layout is not documented here. write_binary_log packs
+# the csv exports into it. Little-endian and packed:
+#   header, then `highres_count` high-res frames, then `lowres_count` low-res frames
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S4'),
+    ('version', '<u2'),
+    ('reserved', '<u2'),
+    ('highres_count', '<u4'),
+    ('lowres_count', '<u4'),
+])
+
+HIGHRES_DTYPE = np.dtype([
+    ('sync', 'u1'),
+    ('accel', '<i2', (3,)),
+    ('gyro', '<i2', (3,)),
+    ('mag', '<i2', (3,)),
+])
+
+LOWRES_DTYPE = np.dtype([
+    ('sync', 'u1'),
+    ('pressure', '<u4'),
+    ('temperature', '<i2'),
+])
+
+MAGIC = b'AVLG'
+VERSION = 1
+
+
+class BinaryLog:
+    def __init__(self, path: str):
+        """
+        Memory-maps a binary log (see HEADER_DTYPE) and exposes its frames
+        as structured array views. Nothing is copied until a column is used.
+
+        Args:
+            path (str): Path to the binary log
+        """
+        self.path = path
+        self.buffer = np.memmap(path, dtype=np.uint8, mode='r')
+
+        if len(self.buffer) < HEADER_DTYPE.itemsize:
+            raise ValueError(f"{path} is too small to be a binary log")
+
+        header = self.buffer[:HEADER_DTYPE.itemsize].view(HEADER_DTYPE)[0]
+        if header['magic'] != MAGIC:
+            raise ValueError(f"{path} is not a binary log (bad magic {header['magic']!r})")
+        if header['version'] != VERSION:
+            raise ValueError(f"{path} has unsupported log version {header['version']}")
+
+        # the header's record counts are checked before any block is viewed
+        highres_end = HEADER_DTYPE.itemsize + int(header['highres_count']) * HIGHRES_DTYPE.itemsize
+        lowres_end = highres_end + int(header['lowres_count']) * LOWRES_DTYPE.itemsize
+        if lowres_end > len(self.buffer):
+            raise ValueError(
+                f"{path} is truncated ({len(self.buffer)} of {lowres_end} bytes for "
+                f"{header['highres_count']} high-res and {header['lowres_count']} low-res records)"
+            )
+
+        self.highres = self.buffer[HEADER_DTYPE.itemsize:highres_end].view(HIGHRES_DTYPE)
+        self.lowres = self.buffer[highres_end:lowres_end].view(LOWRES_DTYPE)
+
+    def highres_frame(self, capitalise: bool = False) -> pd.DataFrame:
+        """
+        Builds the high-res DataFrame without copying per record.
+
+        Args:
+            capitalise (bool): Use the `Accel_X` style names of data_highres.csv
+                instead of the `accel_x` style names of data_highres_2.csv
+        Returns:
+            A DataFrame of sync, accel, gyro and mag columns
+        """
+        columns = {'sync': self.highres['sync']}
+        for sensor in ('accel', 'gyro', 'mag'):
+            values = self.highres[sensor]
+            for i, axis in enumerate('xyz'):
+                name = f"{sensor.capitalize()}_{axis.upper()}" if capitalise else f"{sensor}_{axis}"
+                columns[name] = values[:, i]
+
+        return pd.DataFrame(columns, copy=False)
+
+    def lowres_frame(self) -> pd.DataFrame:
+        """
+        Builds the low-res DataFrame without copying per record.
+
+        Returns:
+            A DataFrame of sync, pressure and temperature columns
+        """
+        return pd.DataFrame({
+            'sync': self.lowres['sync'],
+            'pressure': self.lowres['pressure'],
+            'temperature': self.lowres['temperature'],
+        }, copy=False)
+
+
+def is_binary_log(path: str) -> bool:
+    """
+    Checks whether a file starts with the binary log magic.
+    """
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_binary_log(path: str, highres: pd.DataFrame, lowres: pd.DataFrame):
+    """
+    Packs frames into the binary log container, e.g. to produce logs from
+    the CSV exports.
+
+    Args:
+        path (str): Output path
+        highres (pd.DataFrame): Frame with sync, accel_*, gyro_* and mag_* columns
+        lowres (pd.DataFrame): Frame with sync, pressure and temperature columns
+    """
+    def column(df, name):
+        # accept either data_highres.csv or data_highres_2.csv naming
+        if name in df:
+            return df[name].to_numpy()
+        sensor, axis = name.split('_')
+        return df[f"{sensor.capitalize()}_{axis.upper()}"].to_numpy()
+
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header['magic'] = MAGIC
+    header['version'] = VERSION
+    header['highres_count'] = len(highres)
+    header['lowres_count'] = len(lowres)
+
+    high = np.zeros(len(highres), dtype=HIGHRES_DTYPE)
+    high['sync'] = column(highres, 'sync')
+    for sensor in ('accel', 'gyro', 'mag'):
+        for i, axis in enumerate('xyz'):
+            high[sensor][:, i] = column(highres, f"{sensor}_{axis}")
+
+    low = np.zeros(len(lowres), dtype=LOWRES_DTYPE)
+    for name in LOWRES_DTYPE.names:
+        low[name] = lowres[name].to_numpy()
+
+    with open(path, 'wb') as f:
+        f.write(header.tobytes())
+        f.write(high.tobytes())
+        f.write(low.tobytes())
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Bump when parse_data (or anything else feeding cached frames) changes output
+# or the entry layout changes
+CACHE_VERSION = 2
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache')
+
+# cache directories --clear-cache already cleared in this process (and,
+# forked after it, its workers), so it only happens once per run
+_cleared = set()
+
+
+class DataCache:
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024):
+        """
+        On-disk cache of loaded and derived DataFrames, stored as
+        uncompressed npz so a warm load is a handful of array reads.
+
+        Args:
+            directory (str): Where cache entries are kept
+            max_bytes (int): Total size the cache is trimmed to after each store
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_args(cls, args: dict) -> 'DataCache':
+        """
+        Builds the cache configured by the command line args, clearing it
+        the first time when --clear-cache was given. args is not changed.
+        """
+        cache = cls(
+            args.get('cache_dir') or DEFAULT_CACHE_DIR,
+            max_bytes=int(args.get('cache_size', 512) * 1024 * 1024)
+        )
+        directory = os.path.abspath(cache.directory)
+        if args.get('clear_cache') and directory not in _cleared:
+            cache.clear()
+            _cleared.add(directory)
+
+        return cache
+
+    def key(self, sources: list, params: dict) -> str:
+        """
+        Builds a cache key from the content of the source files and the
+        parameters that affect the derived frames.
+
+        Args:
+            sources (list): Paths of every file the frames are built from
+            params (dict): JSON serialisable parameters
+        Returns:
+            A hex digest identifying the entry
+        """
+        digest = hashlib.sha256()
+        digest.update(str(CACHE_VERSION).encode())
+        for path in sources:
+            with open(path, 'rb') as f:
+                digest.update(hashlib.file_digest(f, 'sha256').digest())
+        digest.update(json.dumps(params, sort_keys=True).encode())
+
+        return digest.hexdigest()
+
+    def _path(self, key: str, ext: str = 'npz') -> str:
+        return os.path.join(self.directory, f"{key}.{ext}")
+
+    def load(self, key: str) -> dict | None:
+        """
+        Loads the frames stored under a key.
+
+        Returns:
+            A dict of DataFrames by name, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as npz:
+                frames = {}
+                for frame in npz['frame_names']:
+                    columns = npz[f"{frame}/columns"]
+                    frames[str(frame)] = pd.DataFrame(
+                        {name: npz[f"{frame}/{j}"] for j, name in enumerate(columns)},
+                        columns=list(columns),
+                    )
+        except (OSError, KeyError, ValueError):
+            return None
+
+        # mark as recently used for eviction
+        os.utime(path)
+
+        return frames
+
+    def store(self, key: str, frames: dict):
+        """
+        Stores a dict of DataFrames by name under a key, then evicts the
+        least recently used entries until the cache fits in max_bytes.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+
+        arrays = {'frame_names': np.array(list(frames), dtype=str)}
+        for frame, df in frames.items():
+            arrays[f"{frame}/columns"] = np.array(df.columns, dtype=str)
+            for j, name in enumerate(df.columns):
+                values = df[name].to_numpy()
+                if values.dtype == object:
+                    values = values.astype(str)
+                arrays[f"{frame}/{j}"] = values
+
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+        self._evict()
+
+    def load_json(self, key: str):
+        """
+        Loads a small JSON result stored under a key.
+
+        Returns:
+            The stored object, or None on a miss
+        """
+        path = self._path(key, 'json')
+        try:
+            with open(path) as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        os.utime(path)
+
+        return result
+
+    def store_json(self, key: str, result):
+        """
+        Stores a small JSON serialisable result under a key.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+
+        path = self._path(key, 'json')
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(result, f)
+        os.replace(tmp_path, path)
+
+        self._evict()
+
+    def _entries(self) -> list:
+        if not os.path.isdir(self.directory):
+            return []
+
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(('.npz', '.json')):
+                path = os.path.join(self.directory, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        return sorted(entries)
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def clear(self):
+        """
+        Removes every cache entry.
+        """
+        for _, _, path in self._entries():
+            os.remove(path)
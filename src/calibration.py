@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+
+from .alignment import timebase
+from .lib.memo import frame_memo
+
+
+G = 9.81
+GYRO_SENSITIVITY = 13.375  # LSB/degree
+ACCEL_SENSITIVITY = 0.031  # mG/LSB (converted to g)
+FEET_PER_METRE = 3.28
+
+# Pre-launch samples closer to liftoff than this may already see ignition
+IDLE_MARGIN = 0.5  # seconds
+# Fewer idle samples than this give no bias estimate
+MIN_IDLE_SAMPLES = 50
+
+
+class SensorSpec:
+    __slots__ = ('prefix', 'scale', 'axes', 'signs')
+
+    def __init__(self, prefix: str, scale: float, axes: str = 'xyz', signs: tuple = (1, 1, 1)):
+        """
+        How to turn one sensor's raw columns into a scaled (N,3) array
+
+        Args:
+            prefix (str): Column prefix, e.g. 'Accel' for Accel_X or accel_x
+            scale (float): Multiplier from logged units to output units
+            axes (str): Which logged axis feeds each output axis
+            signs (tuple): Sign applied to each output axis
+        """
+        self.prefix = prefix
+        self.scale = scale
+        self.axes = axes
+        self.signs = signs
+
+
+# Output units are m/s^2 for accel and degrees/s for gyro. Axes are mapped
+# to the frame the AV and Blue Raven plots are compared in.
+SENSORS = {
+    'AV': {
+        'accel': SensorSpec('Accel', ACCEL_SENSITIVITY * G, 'yzx'),
+        'gyro': SensorSpec('Gyro', 1 / GYRO_SENSITIVITY, 'xzy'),
+        'mag': SensorSpec('Mag', 1.0),
+    },
+    'BR': {
+        'accel': SensorSpec('Accel', G, 'zyx', (-1, 1, 1)),
+        'gyro': SensorSpec('Gyro', 1.0, 'xzy', (1, -1, 1)),
+    },
+}
+
+
+def parse_axis(arg: str) -> tuple:
+    """
+    Parses an axis argument such as "xyz[1,1,1]" or "xzy[1,-1,1]".
+
+    Returns:
+        A tuple of the axes string and the per-axis signs
+    """
+    return arg[:3], tuple(map(float, arg[4:-1].split(',')))
+
+
+def _column(df: pd.DataFrame, prefix: str, axis: str) -> str:
+    # data_highres.csv uses Accel_X, data_highres_2.csv uses accel_x
+    name = f"{prefix}_{axis.upper()}"
+    if name in df:
+        return name
+    return f"{prefix.lower()}_{axis.lower()}"
+
+
+def scaled(df: pd.DataFrame, source: str, sensor: str, axes: str | None = None, signs: tuple | None = None, debias: bool = False) -> np.ndarray:
+    """
+    Scaled (N,3) float array for one sensor of a dataset. Results are
+    memoised per DataFrame so every tab shares one conversion.
+
+    Args:
+        df (pd.DataFrame): The dataset
+        source (str): 'AV' or 'BR'
+        sensor (str): 'accel', 'gyro' or 'mag'
+        axes (str | None): Override the spec's axis mapping
+        signs (tuple | None): Override the spec's signs
+        debias (bool): Subtract the bias estimated by bias()
+    Returns:
+        A read-only (N,3) float64 array
+    """
+    spec = SENSORS[source][sensor]
+    axes = axes or spec.axes
+    signs = tuple(signs or spec.signs)
+
+    entries = frame_memo(df)
+
+    key = ('scaled', source, sensor, axes, signs, debias)
+    if key not in entries:
+        if debias:
+            values = scaled(df, source, sensor, axes, signs) - bias(df, source, sensor, axes, signs)
+        else:
+            raw = df[[_column(df, spec.prefix, axis) for axis in axes]].to_numpy(dtype=np.float64)
+            values = raw * (spec.scale * np.asarray(signs, dtype=np.float64))
+        values.flags.writeable = False
+        entries[key] = values
+
+    return entries[key]
+
+
+def estimate_bias(idle: np.ndarray, source: str, sensor: str = 'gyro') -> np.ndarray:
+    """
+    Interquartile mean of each axis of samples logged at rest, which
+    ignores handling bumps but still resolves offsets below the logged
+    resolution.
+
+    Args:
+        idle (np.ndarray): (N,3) scaled samples of the pre-launch idle window
+        source (str): 'AV' or 'BR', for the warning
+        sensor (str): 'accel', 'gyro' or 'mag', for the warning
+    Returns:
+        A (3,) array in scaled units, zeros with a warning when there are
+        fewer than MIN_IDLE_SAMPLES
+    """
+    if len(idle) < MIN_IDLE_SAMPLES:
+        print(f"Warning: {len(idle)} {source} {sensor} samples before liftoff, {MIN_IDLE_SAMPLES} are needed to estimate a bias. Using the {sensor} as logged.")
+        return np.zeros(3)
+
+    quarter = len(idle) // 4
+    return np.sort(idle, axis=0)[quarter:len(idle) - quarter].mean(axis=0)
+
+
+def bias(df: pd.DataFrame, source: str, sensor: str = 'gyro', axes: str | None = None, signs: tuple | None = None) -> np.ndarray:
+    """
+    Zero offset of a sensor while the rocket sits on the pad, meant for
+    gyros. See estimate_bias, over the samples logged before the
+    pre-launch idle window ends. Memoised like scaled().
+
+    Args:
+        df (pd.DataFrame): The dataset
+        source (str): 'AV' or 'BR'
+        sensor (str): 'accel', 'gyro' or 'mag'
+        axes (str | None): Override the spec's axis mapping
+        signs (tuple | None): Override the spec's signs
+    Returns:
+        A read-only (3,) array in scaled units, zeros when the log has no
+        pre-launch samples (AV logs start at liftoff)
+    """
+    spec = SENSORS[source][sensor]
+    axes = axes or spec.axes
+    signs = tuple(signs or spec.signs)
+
+    entries = frame_memo(df)
+
+    key = ('bias', source, sensor, axes, signs)
+    if key not in entries:
+        idle = scaled(df, source, sensor, axes, signs)[timebase(df) < -IDLE_MARGIN]
+        offset = estimate_bias(idle, source, sensor)
+        offset.flags.writeable = False
+        entries[key] = offset
+
+    return entries[key]
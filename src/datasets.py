@@ -0,0 +1,98 @@
+def axis_columns(prefix: str, upper: bool = True) -> tuple:
+    """
+    Returns:
+        The x, y and z column names of a sensor, e.g. ('Accel_X', 'Accel_Y', 'Accel_Z')
+    """
+    return tuple(f"{prefix}_{axis.upper() if upper else axis}" for axis in 'xyz')
+
+
+# dataset name -> the csv file it is read from
+DATASETS = {
+    'highres': 'data_highres.csv',
+    'raven_highres': 'data_raven_highres.csv',
+    'lowres': 'data_lowres.csv',
+    'raven_lowres': 'data_raven_lowres.csv',
+    'highres_2': 'data_highres_2.csv',
+}
+
+# derived product name -> the datasets and columns parse_data builds it from
+PRODUCTS = {
+    'quaternions_AV': {'highres': ('sync', *axis_columns('Gyro'))},
+    'quaternions_BR': {'raven_highres': ('Flight_Time_(s)', *axis_columns('Gyro'))},
+}
+
+# tilt columns binary logs lack, parse_data derives them from quaternions_AV
+TILT_COLUMNS = ('Tilt_(degrees)', 'Tilt_Cosine')
+TILT_DATASETS = ('highres', 'highres_2')
+
+
+class FlightData(dict):
+    """
+    The datasets and derived products of a flight by name, see DATASETS
+    and PRODUCTS. Only what was required when loading is present.
+    """
+    def __missing__(self, name):
+        if name in DATASETS or name in PRODUCTS:
+            raise KeyError(f"'{name}' was not loaded, add it to the analysis' requirements")
+        raise KeyError(name)
+
+
+def merge_requirements(*requirements: dict) -> dict:
+    """
+    Combines the requirements of several analyses. Each maps a dataset or
+    product name to the columns read from it, or None for every column.
+
+    Returns:
+        The union as a dict of name -> sorted tuple of columns (or None)
+    """
+    merged = {}
+    for requires in requirements:
+        for name, columns in requires.items():
+            if name in merged and merged[name] is None:
+                continue
+            if columns is None:
+                merged[name] = None
+            else:
+                merged[name] = tuple(sorted(set(merged.get(name, ())) | set(columns)))
+
+    return merged
+
+
+def resolve(requires: dict | None, binary: bool = False) -> tuple:
+    """
+    Expands requirements into what has to be loaded and derived.
+
+    Args:
+        requires (dict | None): Merged requirements, None for everything
+        binary (bool): Whether the AV datasets come from a binary log,
+            which has no tilt columns
+    Returns:
+        A tuple of the datasets to read, as a dict of name -> columns (None
+        for every column), and the set of products to derive
+    """
+    if requires is None:
+        return {name: None for name in DATASETS}, set(PRODUCTS)
+
+    datasets = {}
+    products = set()
+
+    def need(name, columns):
+        if name in PRODUCTS:
+            products.add(name)
+            for dataset, product_columns in PRODUCTS[name].items():
+                need(dataset, product_columns)
+        elif name in DATASETS:
+            datasets.update(merge_requirements(datasets, {name: columns}))
+        else:
+            raise KeyError(f"Unknown dataset or product '{name}'")
+
+    for name, columns in requires.items():
+        need(name, columns)
+
+    if binary and any(
+        name in datasets and (datasets[name] is None or set(TILT_COLUMNS) & set(datasets[name]))
+        for name in TILT_DATASETS
+    ):
+        need('quaternions_AV', None)
+
+    return datasets, products
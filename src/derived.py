@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+from .lib.math import QuaternionArray
+from .lib import memo
+
+
+# derived product name -> (function, names of the products it is computed from)
+DERIVED = {}
+
+def derives(name: str, *depends: str):
+    """
+    Registers a derived product. The decorated function takes a dataset
+    or quaternion estimate (plus any params) and returns an array.
+
+    Args:
+        name (str): Product name passed to derived()
+        depends (str): Products the function reads through derived(), so
+            invalidating one of them drops this one too
+    """
+    def register(function):
+        DERIVED[name] = (function, depends)
+        return function
+    return register
+
+
+def derived(df: pd.DataFrame, name: str, **params) -> np.ndarray:
+    """
+    A derived product of a dataset or quaternion estimate, computed on
+    first use and memoised on the frame for each set of params, so every
+    tab shares one computation. The memo is dropped when the frame gains
+    rows or columns (see lib.memo.frame_stamp) or is invalidated.
+
+    Args:
+        df (pd.DataFrame): A dataset, or an estimate from parse_data
+        name (str): A product in DERIVED
+        params: Passed on to the product's function
+    Returns:
+        A read-only array with one row per row of df
+    """
+    function, _ = DERIVED[name]
+
+    entries = memo.frame_memo(df)
+    key = ('derived', name, tuple(sorted(params.items())))
+    if key not in entries:
+        values = function(df, **params)
+        values.flags.writeable = False
+        entries[key] = values
+
+    return entries[key]
+
+
+def dependents(name: str) -> set:
+    """
+    Returns:
+        The product and every product computed from it, directly or not
+    """
+    names = {name}
+    for product, (_, depends) in DERIVED.items():
+        if name in depends and product != name:
+            names |= dependents(product)
+
+    return names
+
+
+def invalidate(df: pd.DataFrame, *names: str):
+    """
+    Drops memoised products after a frame's values were overwritten in
+    place. Changes to its rows or columns are picked up without this.
+
+    Args:
+        df (pd.DataFrame): The changed frame
+        names (str): Products whose inputs changed, they and everything
+            derived from them are dropped. None drops everything memoised
+            for the frame, including timebases and scaled sensors.
+    """
+    if not names:
+        memo.invalidate(df)
+        return
+
+    stale = set().union(*(dependents(name) for name in names))
+    entries = memo.frame_memo(df)
+    for key in [key for key in entries if isinstance(key, tuple) and key[0] == 'derived' and key[1] in stale]:
+        del entries[key]
+
+
+# MARK: products
+
+@derives('quaternions')
+def _quaternions(df):
+    """
+    (N,4) (x, y, z, w) orientations of an estimate, or the Blue Raven's
+    own Quat_1..4 (w, x, y, z, with the opposite handedness)
+    """
+    if 'w' in df:
+        return df[['x', 'y', 'z', 'w']].to_numpy(dtype=np.float64)
+    if 'Quat_1' in df:
+        return df[['Quat_4', 'Quat_3', 'Quat_2', 'Quat_1']].to_numpy(dtype=np.float64) * (-1, 1, 1, 1)
+    raise KeyError("frame has no x, y, z, w or Quat_1..4 columns to read orientations from")
+
+
+@derives('euler', 'quaternions')
+def _euler(df):
+    """(N,3) roll, pitch and yaw in degrees"""
+    return QuaternionArray(derived(df, 'quaternions')).as_euler(degrees=True).as_array()
+
+
+@derives('rotation_matrices', 'quaternions')
+def _rotation_matrices(df):
+    """(N,3,3) rotation matrices, identity where the quaternion is zero or not finite"""
+    quats = derived(df, 'quaternions')
+    valid = np.all(np.isfinite(quats), axis=1) & np.any(quats != 0, axis=1)
+
+    if valid.all():
+        return QuaternionArray(quats).as_matrix()
+
+    rotations = np.empty((len(quats), 3, 3))
+    rotations[:] = np.identity(3)
+    rotations[valid] = QuaternionArray(quats[valid]).as_matrix()
+
+    return rotations
+
+
+@derives('tilt_cosine', 'quaternions')
+def _tilt_cosine(df):
+    """Cosine of the angle between the body z axis and vertical"""
+    # AV csv files log it
+    if 'Tilt_Cosine' in df:
+        return df['Tilt_Cosine'].to_numpy(dtype=np.float64)
+
+    # z component of the rotated body z axis
+    quats = derived(df, 'quaternions')
+    return 1 - 2 * (quats[:, 0]**2 + quats[:, 1]**2)
+
+
+@derives('tilt', 'tilt_cosine')
+def _tilt(df):
+    """Angle between the body z axis and vertical in degrees"""
+    if 'Tilt_(degrees)' in df:
+        return df['Tilt_(degrees)'].to_numpy(dtype=np.float64)
+
+    return np.degrees(np.arccos(np.clip(derived(df, 'tilt_cosine'), -1.0, 1.0)))
@@ -0,0 +1,85 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .datasets import DATASETS
+from . import instrument
+
+
+# dataset or product name -> output file name
+EXPORTS = {
+    **DATASETS,
+    'quaternions_AV': "quaternion_estimate_AV.csv",
+    'quaternions_BR': "quaternion_estimate_BR.csv",
+}
+
+
+def write_csv(df: pd.DataFrame, path: str, chunk_rows: int = 50_000) -> tuple:
+    """
+    Writes a DataFrame as csv in chunks, so the full text is never built in
+    memory. The file is written next to its destination and moved into
+    place once complete.
+
+    Args:
+        df (pd.DataFrame): Frame to write
+        path (str): Output path
+        chunk_rows (int): Rows formatted per chunk
+    Returns:
+        A tuple of (rows, bytes, seconds)
+    """
+    start = time.perf_counter()
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', newline='') as f:
+        if len(df) == 0:
+            df.to_csv(f, index=False)
+        for i in range(0, len(df), chunk_rows):
+            df.iloc[i:i + chunk_rows].to_csv(f, header=(i == 0), index=False)
+    os.replace(tmp_path, path)
+
+    return len(df), os.path.getsize(path), time.perf_counter() - start
+
+
+def export_csv(data: dict, output_dir: str, workers: int | None = None, chunk_rows: int = 50_000) -> list:
+    """
+    Writes every dataset to csv concurrently on a process pool and reports
+    the throughput of each file.
+
+    Args:
+        data (dict): FlightData from get_data
+        output_dir (str): Directory the files are written to
+        workers (int | None): Worker processes, defaults to all cores
+        chunk_rows (int): Rows formatted per chunk
+    Returns:
+        A list of (name, rows, bytes, seconds) for each file
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    jobs = [
+        (name, data[frame], os.path.join(output_dir, name))
+        for frame, name in EXPORTS.items()
+        if frame in data
+    ]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+
+    start = time.perf_counter()
+    if workers == 1:
+        stats = [write_csv(df, path, chunk_rows) for _, df, path in jobs]
+    else:
+        with ProcessPoolExecutor(workers, initializer=instrument.init_worker, initargs=(None,)) as pool:
+            futures = [pool.submit(write_csv, df, path, chunk_rows) for _, df, path in jobs]
+            stats = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    results = []
+    for (name, _, _), (rows, size, seconds) in zip(jobs, stats):
+        mb = size / (1024 * 1024)
+        print(f"{name}: {rows} rows, {mb:.1f} MB in {seconds:.2f}s ({mb / max(seconds, 1e-9):.1f} MB/s)")
+        results.append((name, rows, size, seconds))
+
+    total_mb = sum(size for _, _, size, _ in results) / (1024 * 1024)
+    print(f"Exported {len(results)} files, {total_mb:.1f} MB in {elapsed:.2f}s ({total_mb / max(elapsed, 1e-9):.1f} MB/s)")
+
+    return results
@@ -1,37 +1,116 @@
-import tkinter as tk
-from tkinter import ttk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+import matplotlib
+from matplotlib.figure import Figure
 
+from .lib.decimate import plot_decimated
+from . import instrument
 
-class GraphTab(ttk.Frame):
-	def __init__(self, parent: ttk.Notebook, data: list, args: dict):
+
+# datasets and args shared by compute() in worker processes
+_worker_data = None
+_worker_args = None
+
+
+def init_compute_worker(data: dict, args: dict, profile: tuple | None = None):
+	"""
+	ProcessPoolExecutor initializer, the datasets are sent once per worker
+	rather than once per tab. profile is instrument.worker_state()
+	"""
+	global _worker_data, _worker_args
+	instrument.init_worker(profile)
+	_worker_data = data
+	_worker_args = args
+
+
+def run_compute(cls: type, options: dict, title: str) -> tuple:
+	"""
+	Runs a tab's compute step in a worker process set up by init_compute_worker
+
+	Returns:
+		The result, and the spans recorded computing it
+	"""
+	with instrument.span(f"{title}.compute"):
+		result = cls.compute(_worker_data, _worker_args, **options)
+
+	return result, instrument.collect()
+
+
+# tab name -> (GraphTab subclass, options), in the order they are shown
+TABS = {}
+
+
+def register_tab(name: str, **options):
+	"""
+	Class decorator adding a tab to TABS. Stack it to add a class more than
+	once with different options, which are passed to __init__ and compute()
+	"""
+	def register(cls):
+		TABS[name] = (cls, options)
+		return cls
+	return register
+
+
+class GraphTab:
+	# dataset or product name -> the columns compute() reads from it (None
+	# for all of them), so only these are loaded. See datasets.py
+	requires = {}
+
+	def __init__(self, data: dict, args: dict):
 		"""
+		One analysis and its figure. The figure is only created and drawn
+		by create_figure() and graph(), by the App when the tab is first
+		shown or by render.py without a window
 
 		Args:
-			parent (ttk.Notebook): The parent notebook
-			data (list): a list of datasets to be used
+			data (dict): FlightData with at least the tab's requirements
+			args (dict): Command line args
 		"""
-		super().__init__(parent)
 		self.title = "Undefined"
 		self.data = data
 		self.args = args
+		self.fig = None
+		self.ax = None
+		# set by the App when compute() runs on its process pool, see run_compute
+		self.future = None
 
 		self.setup()
 
-		parent.add(self, text=self.title)
-		plt.rcParams['font.size'] = 7
-		self.fig, self.ax = plt.subplots(figsize=(6, 4), dpi=80)
+	@classmethod
+	def requirements(cls, **options) -> dict:
+		"""
+		The requirements of a tab with these options, by default `requires`
+		"""
+		return cls.requires
 
-		self.graph()
+	@property
+	def options(self) -> dict:
+		"""
+		Keyword arguments for compute() that vary per tab instance
+		"""
+		return {}
 
-		canvas = FigureCanvasTkAgg(self.fig, master=self)
-		toolbar = NavigationToolbar2Tk(canvas, self)
-		toolbar.update()
+	def ready(self) -> bool:
+		"""
+		Whether graph() can draw without waiting for compute()
+		"""
+		return self.future is None or self.future.done()
+
+	def create_figure(self, dpi: float = 80) -> Figure:
+		"""
+		Creates the figure graph() draws on. It is not attached to pyplot
+		or any backend, the caller adds a canvas
+		"""
+		matplotlib.rcParams['font.size'] = 7
+		self.fig = Figure(figsize=(6, 4), dpi=dpi)
+		self.ax = self.fig.add_subplot()
+
+		if instrument.enabled():
+			tight_layout = self.fig.tight_layout
+			def timed_tight_layout(*args, **kwargs):
+				with instrument.span(f"{self.title}.tight_layout"):
+					return tight_layout(*args, **kwargs)
+			self.fig.tight_layout = timed_tight_layout
 
-		canvas.draw()
-		canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
-		toolbar.pack(side=tk.BOTTOM, fill=tk.X)
+		return self.fig
 
 	def setup(self):
 		"""
@@ -39,8 +118,45 @@ class GraphTab(ttk.Frame):
 		"""
 		pass
 
+	@classmethod
+	def compute(cls, data: dict, args: dict, **options) -> dict:
+		"""
+		Should be used for the numeric work behind the graph. Runs in a
+		worker process, so it must only use its arguments and should
+		return plain arrays
+
+		Args:
+			data (dict): FlightData with at least the tab's requirements
+			args (dict): Command line args
+			**options: From self.options
+		Returns:
+			A dict of results for render()
+		"""
+		return {}
+
+	def render(self, result: dict):
+		"""
+		Should be used to plot a compute() result on self.fig
+		"""
+		pass
+
 	def graph(self):
 		"""
-		Should be used to plot data on self.fig
+		Computes (unless the App already has) and renders the graph
+		"""
+		if self.future is not None:
+			result, events = self.future.result()
+			instrument.merge(events)
+		else:
+			with instrument.span(f"{self.title}.compute"):
+				result = self.compute(self.data, self.args, **self.options)
+
+		with instrument.span(f"{self.title}.render"):
+			self.render(result)
+
+	def plot(self, ax, x, y, *args, **kwargs):
+		"""
+		ax.plot for time series, drawing a per-pixel min/max reduction
+		that is recomputed from the full data when zooming or panning
 		"""
-		pass
\ No newline at end of file
+		return plot_decimated(ax, x, y, *args, **kwargs)
@@ -0,0 +1,11 @@
+# importing the graph modules registers their tabs, in the order they are shown
+from . import (  # noqa: F401
+    acceleration_graph,
+    velocity_graph,
+    tilt_graph,
+    gyro_graph,
+    gyro_state_graph,
+    rotation_graph,
+    kalman_graph,
+    attitude_graph,
+)
@@ -1,38 +1,47 @@
 import numpy as np
 
-from ..graph_tab import GraphTab
+from ..alignment import timebase
+from ..calibration import scaled
+from ..datasets import axis_columns
+from ..graph_tab import GraphTab, register_tab
 
 
+@register_tab('acceleration')
 class AccelerationGraph(GraphTab):
+    requires = {
+        'highres': ('sync', 'Tilt_Cosine', *axis_columns('Accel')),
+        'raven_highres': ('Flight_Time_(s)', *axis_columns('Accel')),
+    }
+
     def setup(self):
         self.title = "Acceleration"
 
-    def graph(self):
-        data = self.data[0]
-        data_br = self.data[1]
-        
-        sensitivity = 0.031  # mG/LSB (converted to g)
+    @classmethod
+    def compute(cls, data, args):
+        data_br = data['raven_highres']
+        data = data['highres']
+
         total_time = 50
-        dt = 0.004  # Time step (seconds)
-        dt_br = 0.002  # Time step (seconds)
-        g = 9.81
 
-        t = [dt*x for x in range(int(total_time / dt))]
-        t_br = [dt_br*x-2 for x in range(int(total_time / dt_br))]
+        count = np.searchsorted(timebase(data), total_time)
+        count_br = np.searchsorted(timebase(data_br), total_time)
+        t = timebase(data)[0:count]
+        t_br = timebase(data_br)[0:count_br]
 
         # Extract and scale sensor data
-        accel = np.array([
-            [d['Accel_Y'] * d['Tilt_Cosine'] * sensitivity * g,
-            d['Accel_Z'] * d['Tilt_Cosine'] * sensitivity * g,
-            d['Accel_X'] * d['Tilt_Cosine'] * sensitivity * g]
-            for (_, d) in data.iterrows()
-        ])
-        accel_br = np.array([
-            [d['Accel_Z'] * -g,
-            d['Accel_Y'] * g,
-            d['Accel_X'] * g]
-            for (_, d) in data_br.iterrows()
-        ])
+        accel = scaled(data, 'AV', 'accel') * data['Tilt_Cosine'].to_numpy()[:, None]
+        accel_br = scaled(data_br, 'BR', 'accel')
+
+        return {
+            't': t,
+            't_br': t_br,
+            'accel': accel[0:count],
+            'accel_br': accel_br[0:count_br],
+        }
+
+    def render(self, result):
+        t, t_br = result['t'], result['t_br']
+        accel, accel_br = result['accel'], result['accel_br']
 
         self.ax.clear()
         self.ax.set_axis_off()
@@ -40,20 +49,20 @@ class AccelerationGraph(GraphTab):
 
         ax1, ax2, ax3 = self.fig.subplots(3, 1)      
 
-        ax1.plot(t, accel[0:int(total_time / dt), 0], label="A1 Avionics")
-        ax1.plot(t_br, accel_br[0:int(total_time / dt_br), 0], label="Blue Raven")
+        self.plot(ax1, t, accel[:, 0], label="A1 Avionics")
+        self.plot(ax1, t_br, accel_br[:, 0], label="Blue Raven")
         ax1.set_xlabel('Time (s)')
         ax1.set_ylabel('Acceleration (m/s^2)')
         ax1.legend()
         
-        ax2.plot(t, accel[0:int(total_time / dt), 0], label="A1 Avionics")
-        ax2.plot(t_br, accel_br[0:int(total_time / dt_br), 1], label="Blue Raven")
+        self.plot(ax2, t, accel[:, 0], label="A1 Avionics")
+        self.plot(ax2, t_br, accel_br[:, 1], label="Blue Raven")
         ax2.set_xlabel('Time (s)')
         ax2.set_ylabel('Acceleration (m/s^2)')
         ax2.legend()
         
-        ax3.plot(t, accel[0:int(total_time / dt), 0], label="A1 Avionics")
-        ax3.plot(t_br, accel_br[0:int(total_time / dt_br), 2], label="Blue Raven")
+        self.plot(ax3, t, accel[:, 0], label="A1 Avionics")
+        self.plot(ax3, t_br, accel_br[:, 2], label="Blue Raven")
         ax3.set_xlabel('Time (s)')
         ax3.set_ylabel('Acceleration (m/s^2)')
         ax3.legend()
@@ -1,138 +1,187 @@
 import matplotlib.animation as animation
 import pandas as pd
 import numpy as np
-from scipy.spatial.transform import Rotation
-import os
 
-from ..graph_tab import GraphTab
+from ..alignment import estimate_liftoff_index
+from ..derived import derived
+from ..graph_tab import GraphTab, register_tab
+from .. import instrument
 
+# attitude data source -> the estimate and the dataset it was integrated from
+SOURCES = {
+    'AV': ('quaternions_AV', 'highres'),
+    'BR': ('quaternions_BR', 'raven_highres'),
+}
+
+# ms between the samples of each attitude source
+INTERVAL_MS = {'AV': 4, 'BR': 2}
+
+
+def frame_indices(count: int, interval_ms: float, fps: float, playback_speed: float = 1.0) -> range:
+    """
+    Sample indices shown, one per animation frame at the playback speed.
+
+    Args:
+        count (int): Number of samples
+        interval_ms (float): Time between samples
+        fps (float): Animation frame rate
+        playback_speed (float): Multiple of real time
+    """
+    frame_ms = 1000.0 / fps
+    step = max(1, round(playback_speed * frame_ms / interval_ms))
+    return range(0, count, step)
+
+
+# decorators apply bottom up, so AV is registered (and shown) first
+@register_tab('attitude_br', data_source='BR')
+@register_tab('attitude_av', data_source='AV')
 class AttitudeGraph(GraphTab):
     def setup(self):
         self.title = f"Attitude ({self.data_source})"
 
-    def __init__(self, master, data, args, data_source='BR', save_animation_on_start=False):
+    def __init__(self, data, args, data_source='BR'):
         self.data_source = data_source
         self.data = data
         self.title = f"Attitude ({self.data_source})"
 
-        self.quaternions = []
-        self.rotations = []
+        self.quaternions = np.empty((0, 4))
+        self.rotations = np.empty((0, 3, 3))
         self.start_point = np.array([0, 0, 0])
-        self.interval_ms = 2 if self.data_source == 'BR' else 4
+        self.interval_ms = INTERVAL_MS[self.data_source]
+        # Animation frames are decimated to the display rate
+        self.fps = args.get('fps', 60)
+        self.playback_speed = args.get('playback_speed', 1.0)
         self.xaxis_q = None
         self.yaxis_q = None
         self.zaxis_q = None
         self.time_label = None
         self.ani = None
 
-        self._load_attitude_data()
-        if self.quaternions:
-            self._calculate_rotations()
+        super().__init__(data, args)
 
-        super().__init__(master, data, args)
+    @property
+    def options(self):
+        return {'data_source': self.data_source}
 
-        # self.output_dir = args.get('attitude_output_dir', os.path.join('.', 'data_csv', 'animations'))
-        # os.makedirs(self.output_dir, exist_ok=True)
+    @classmethod
+    def requirements(cls, data_source='BR'):
+        quaternions, dataset = SOURCES[data_source]
+        # the dataset's timebase finds liftoff
+        return {quaternions: None, dataset: ('sync',) if data_source == 'AV' else ('Flight_Time_(s)',)}
 
-        # if save_animation_on_start and self.ani:
-        #     self.save_animation_to_file()
-        # elif save_animation_on_start:
-        #     print(f"Warning: Animation for {self.data_source} not created during init, cannot save on start.")
-
-    def _load_attitude_data(self):
+    @staticmethod
+    def _load_attitude_data(data, data_source):
         """
-        Loads quaternion data from the main data object (self.data)
-        Expects data[5] for AV and data[6] for BR from parse_data.
+        Loads quaternion data from the datasets.
+        Expects quaternions_AV or quaternions_BR from parse_data.
+
+        Returns:
+            An (N,4) array of (x, y, z, w) quaternions from liftoff
         """
         df_quats = None
-        source_index = -1
 
-        if self.data_source == 'AV':
-            source_index = 5
-        elif self.data_source == 'BR':
-            source_index = 6
-        else:
-            print(f"Warning: Unknown data source '{self.data_source}' for attitude data.")
-            self.quaternions = []
-            return
+        if data_source not in SOURCES:
+            print(f"Warning: Unknown data source '{data_source}' for attitude data.")
+            return np.empty((0, 4))
+        source_name, dataset = SOURCES[data_source]
 
-        if len(self.data) > source_index and isinstance(self.data[source_index], pd.DataFrame):
-            df_quats = self.data[source_index]
+        if isinstance(data.get(source_name), pd.DataFrame):
+            df_quats = data[source_name]
         else:
-            print(f"Warning: Quaternion data for {self.data_source} (expected at data[{source_index}]) not found or not a DataFrame.")
-            self.quaternions = []
-            return
+            print(f"Warning: Quaternion data for {data_source} (expected at data['{source_name}']) not found or not a DataFrame.")
+            return np.empty((0, 4))
         
         if not all(col in df_quats.columns for col in ['x', 'y', 'z', 'w']):
-            print(f"Warning: Quaternion DataFrame for {self.data_source} is missing x,y,z, or w columns.")
-            self.quaternions = []
-            return
+            print(f"Warning: Quaternion DataFrame for {data_source} is missing x,y,z, or w columns.")
+            return np.empty((0, 4))
 
-        loaded_quats = list(zip(
-            df_quats['x'], df_quats['y'], df_quats['z'], df_quats['w']
-        ))
+        loaded_quats = df_quats[['x', 'y', 'z', 'w']].to_numpy(dtype=np.float64)
 
-        if self.data_source == 'AV':
-            print(f"[DEBUG AV Load] Trying to load AV quaternions from self.data[{source_index}].")
+        if data_source == 'AV':
+            print(f"[DEBUG AV Load] Trying to load AV quaternions from data['{source_name}'].")
             if df_quats is not None:
                 print(f"[DEBUG AV Load] AV DataFrame head:\n{df_quats.head()}")
             else:
                 print(f"[DEBUG AV Load] AV DataFrame (df_quats) is None.")
 
-        # Apply 1000 sample offset for BR data to match original plot_attitude.py behavior
-        # This assumes parse_data.py provides the full BR quaternion dataset.
-        if self.data_source == 'BR':
-            if len(loaded_quats) > 1000:
-                print(f"[Debug] Applying 1000 sample offset to BR quaternion data for attitude plot. Original length: {len(loaded_quats)}")
-                self.quaternions = loaded_quats[1000:]
-                print(f"[Debug] New length for BR: {len(self.quaternions)}")
-            else:
-                print(f"Warning: BR quaternion data for {self.data_source} has less than 1000 samples ({len(loaded_quats)}), cannot apply offset.")
-                self.quaternions = loaded_quats # Use as is
-        else:
-            self.quaternions = loaded_quats
+        # Start the animation at liftoff, skipping any pre-launch samples
+        # This assumes parse_data.py provides the full quaternion dataset.
+        offset = estimate_liftoff_index(data[dataset])
+        if offset:
+            print(f"[Debug] Skipping {offset} pre-launch samples of {data_source} quaternion data for attitude plot. Original length: {len(loaded_quats)}")
+        quaternions = loaded_quats[offset:]
         
-        if self.data_source == 'AV':
-            print(f"[DEBUG AV Load] Loaded {len(self.quaternions)} quaternions for AV.")
-            if len(self.quaternions) > 0:
-                print(f"[DEBUG AV Load] First 3 AV quaternions: {self.quaternions[:3]}")
+        if data_source == 'AV':
+            print(f"[DEBUG AV Load] Loaded {len(quaternions)} quaternions for AV.")
+            if len(quaternions) > 0:
+                print(f"[DEBUG AV Load] First 3 AV quaternions: {quaternions[:3]}")
         
-        if not self.quaternions:
-            print(f"Warning: No quaternion data loaded for {self.data_source}.")
+        if len(quaternions) == 0:
+            print(f"Warning: No quaternion data loaded for {data_source}.")
+
+        return quaternions
+
+
+    @staticmethod
+    def _calculate_rotations(data, data_source):
+        """
+        Rotation matrices from liftoff, shared through the derived
+        products with every other tab reading the same estimate.
+
+        Returns:
+            An (N,3,3) array whose rows are the rotated basis vectors
+        """
+        source_name, dataset = SOURCES[data_source]
+        quats = derived(data[source_name], 'quaternions')
+
+        valid = np.all(np.isfinite(quats), axis=1) & np.any(quats != 0, axis=1)
+        invalid_count = len(quats) - np.count_nonzero(valid)
+        if invalid_count:
+            print(f"Warning: {invalid_count} non-finite or zero quaternions for {data_source}. Using identity.")
+
+        # Rows are the rotated basis vectors, as from Rotation.apply(xyz_basis)
+        rotations = derived(data[source_name], 'rotation_matrices')[estimate_liftoff_index(data[dataset]):].transpose(0, 2, 1)
+
+        if data_source == 'AV' and len(rotations) > 2:
+            print(f"[DEBUG AV Calc] First 3 AV rotation matrices:\n{rotations[0]}\n{rotations[1]}\n{rotations[2]}")
+
+        return rotations
 
+    def _frame_indices(self) -> range:
+        """Sample indices shown, one per display frame at the playback speed."""
+        return frame_indices(len(self.rotations), self.interval_ms, self.fps, self.playback_speed)
 
-    def _calculate_rotations(self):
-        """Calculates rotation matrices for each quaternion."""
-        rotations_list = []
-        xyz_basis = np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1]])
-        if not self.quaternions:
-            print(f"Cannot calculate rotations: No quaternions for {self.data_source}")
-            self.rotations = []
+
+    @classmethod
+    def compute(cls, data, args, data_source='BR'):
+        quaternions = cls._load_attitude_data(data, data_source)
+        rotations = np.empty((0, 3, 3))
+        if len(quaternions):
+            rotations = cls._calculate_rotations(data, data_source)
+
+        return {'quaternions': quaternions, 'rotations': rotations}
+
+    def render(self, result):
+        if not self.draw_axes(result):
             return
 
-        for i, q_tuple in enumerate(self.quaternions):
-            x, y, z, w = q_tuple
-            if not all(np.isfinite([x, y, z, w])):
-                print(f"Warning: Non-finite value in quaternion {q_tuple} at index {i} for {self.data_source}. Using identity.")
-                rotations_list.append(np.identity(3))
-                continue
-            try:
-                # Scipy's Rotation expects (x, y, z, w) for from_quat
-                rotation_matrix = Rotation.from_quat([x, y, z, w]).apply(xyz_basis)
-                rotations_list.append(rotation_matrix)
-            except ValueError as e:
-                print(f"Error processing quaternion {q_tuple} for {self.data_source}: {e}. Using identity.")
-                rotations_list.append(np.identity(3))
-        
-        self.rotations = rotations_list
-        if self.data_source == 'AV' and len(self.rotations) > 2:
-            print(f"[DEBUG AV Calc] First 3 AV rotation matrices:\n{self.rotations[0]}\n{self.rotations[1]}\n{self.rotations[2]}")
-        
-        if not self.rotations:
-            print(f"Warning: No rotations could be calculated for {self.data_source}.")
+        self.ani = animation.FuncAnimation(
+            fig=self.fig, func=self._animate, frames=self._frame_indices(),
+            init_func=self._init_animation, interval=1000.0 / self.fps,
+            blit=True, repeat=True, cache_frame_data=False
+        )
+
+    def draw_axes(self, result) -> bool:
+        """
+        Draws the axes and the first frame's body axes, which _update_frame
+        moves. Shared by the live animation and the file export.
 
+        Returns:
+            Whether there is anything to animate
+        """
+        self.quaternions = result['quaternions']
+        self.rotations = result['rotations']
 
-    def graph(self):
         self.fig.clear() 
         self.ax = self.fig.add_subplot(111, projection='3d')
         
@@ -144,9 +193,9 @@ class AttitudeGraph(GraphTab):
         self.ax.set_ylabel('Y Axis')
         self.ax.set_zlabel('Z Axis')
 
-        if not self.quaternions or not self.rotations:
+        if len(self.quaternions) == 0 or len(self.rotations) == 0:
             self.ax.text2D(0.5, 0.5, f"No data/rotations for {self.data_source}", transform=self.ax.transAxes, ha="center", va="center")
-            return
+            return False
 
         initial_rotation = self.rotations[0]
         self.xaxis_q = self.ax.quiver(*self.start_point, *initial_rotation[0,:], color="r", label='X')
@@ -155,10 +204,10 @@ class AttitudeGraph(GraphTab):
         self.time_label = self.ax.text2D(0.05, 0.95, "t=0.000s (0%)", transform=self.ax.transAxes)
         self.ax.legend(loc='upper right')
 
-        self.ani = animation.FuncAnimation(
-            fig=self.fig, func=self._animate, frames=len(self.quaternions),
-            interval=self.interval_ms, blit=False, repeat=True 
-        )
+        return True
+
+    def _init_animation(self):
+        return (self.xaxis_q, self.yaxis_q, self.zaxis_q, self.time_label)
 
 
     def _quiver_data_to_segments(self, X, Y, Z, u, v, w, length=1):
@@ -171,14 +220,15 @@ class AttitudeGraph(GraphTab):
         return [[[X, Y, Z], [X + u * length, Y + v * length, Z + w * length]]]
 
     def _animate(self, i):
+        with instrument.span(f"{self.title}._animate"):
+            return self._update_frame(i)
+
+    def _update_frame(self, i):
         if i >= len(self.rotations): # Should not happen with FuncAnimation if frames is correct
             return (self.xaxis_q, self.yaxis_q, self.zaxis_q, self.time_label)
 
+        # rotations are always finite, bad quaternions were replaced by identity
         current_rotation = self.rotations[i]
-        if not np.all(np.isfinite(current_rotation)):
-            # Skip update for this frame if data is bad, or use previous
-            print(f"Warning: Non-finite rotation data at frame {i} for {self.data_source}.")
-            return (self.xaxis_q, self.yaxis_q, self.zaxis_q, self.time_label)
 
         # Update X axis
         segments_x = self._quiver_data_to_segments(*self.start_point, *current_rotation[0,:])
@@ -193,29 +243,29 @@ class AttitudeGraph(GraphTab):
         self.zaxis_q.set_segments(segments_z)
         
         time_sec = i * (self.interval_ms / 1000.0)
-        progress_pct = (100.0 * i / len(self.quaternions)) if self.quaternions else 0
+        progress_pct = (100.0 * i / len(self.quaternions)) if len(self.quaternions) else 0
         self.time_label.set_text(f"t={time_sec:.3f}s ({progress_pct:.0f}%)")
 
+        self._project_body_axes()
+
         return (self.xaxis_q, self.yaxis_q, self.zaxis_q, self.time_label)
 
-    # def save_animation_to_file(self):
-    #     if not self.ani:
-    #         print(f"Animation (self.ani) not initialized for {self.data_source}. Cannot save.")
-    #         return
-    #     if not self.quaternions or not self.rotations:
-    #         print(f"No data to animate for {self.data_source}. Cannot save animation.")
-    #         return
+    def _project_body_axes(self):
+        # set_segments only stores the 3D segments, they are projected by a
+        # full draw of the axes, which a blit (the GUI, export_animation) skips
+        for quiver in (self.xaxis_q, self.yaxis_q, self.zaxis_q):
+            quiver.do_3d_projection()
 
-    #     output_filename = f"attitude_animation_{self.data_source}.mp4"
-    #     output_path = os.path.join(self.output_dir, output_filename)
-        
-    #     print(f"Attempting to save animation for {self.data_source} to {output_path}...")
-    #     try:
-    #         # Ensure ffmpeg is installed and in PATH.
-    #         # Adjust dpi or fps (frames per second via 1000/interval_ms) if needed.
-    #         writer = animation.writers['ffmpeg'](fps=1000/self.interval_ms, bitrate=1800)
-    #         self.ani.save(output_path, writer=writer, dpi=150, progress_callback=lambda i, n: print(f'Saving frame {i+1}/{n} for {self.data_source}', end="\r"))
-    #         print(f"\nAnimation for {self.data_source} saved successfully to {output_path}")
-    #     except Exception as e:
-    #         print(f"\nError saving animation for {self.data_source}: {e}")
-    #         print("Please ensure ffmpeg is installed and accessible in your system's PATH.")
\ No newline at end of file
+    def save_animation_to_file(self, path: str, fps: float | None = None, workers: int | None = None) -> str:
+        """
+        Exports the animation to a video (ffmpeg) or GIF, rendering its
+        frames in parallel. See animate.export_animation
+
+        Returns:
+            The path written, a .gif when ffmpeg is missing
+        """
+        from ..animate import export_animation
+        return export_animation(
+            {'quaternions': self.quaternions, 'rotations': self.rotations}, self.data_source, path,
+            fps=fps or self.fps, playback_speed=self.playback_speed, workers=workers
+        )
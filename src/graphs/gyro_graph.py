@@ -1,40 +1,49 @@
 import numpy as np
 import matplotlib.gridspec as gridspec
 
-from ..graph_tab import GraphTab
+from ..alignment import timebase
+from ..calibration import scaled
+from ..datasets import axis_columns
+from ..graph_tab import GraphTab, register_tab
 
 
+@register_tab('gyro')
 class GyroGraph(GraphTab):
+    requires = {
+        'highres_2': ('sync', *axis_columns('gyro', upper=False)),
+        'raven_highres': ('Flight_Time_(s)', *axis_columns('Gyro')),
+    }
+
     def setup(self):
         self.title = "Gyro"
 
-    def graph(self):
-        df = self.data[4]
-        df_br = self.data[1]
-
-        sensitivity = 13.375  # LSB/degree
+    @classmethod
+    def compute(cls, data, args):
+        df = data['highres_2']
+        df_br = data['raven_highres']
 
         total_time = 50
-        dt = 0.004  # Time step (seconds)
-        dt_br = 0.002  # Time step (seconds)
 
-        t = [dt*x for x in range(int(total_time / dt))]
-        t_br = df_br["Flight_Time_(s)"][0:int(total_time / dt_br)]
+        count = np.searchsorted(timebase(df), total_time)
+        count_br = np.searchsorted(timebase(df_br), total_time)
+        t = timebase(df)[0:count]
+        t_br = timebase(df_br)[0:count_br]
 
         # Extract and scale sensor data
-        gyro = np.array([
-            [d['gyro_x'] / sensitivity,
-            d['gyro_z'] / sensitivity,
-            d['gyro_y'] / sensitivity]
-            for (_, d) in df.iterrows()
-        ])
+        debias = args.get('gyro_bias', False)
+        gyro = scaled(df, 'AV', 'gyro', debias=debias)
+        gyro_br = scaled(df_br, 'BR', 'gyro', debias=debias)
+
+        return {
+            't': t,
+            't_br': t_br,
+            'gyro': gyro[0:count],
+            'gyro_br': gyro_br[0:count_br],
+        }
 
-        gyro_br = np.array([
-            [d['Gyro_X'],
-            -d['Gyro_Z'],
-            d['Gyro_Y']]
-            for (_, d) in df_br.iterrows()
-        ])
+    def render(self, result):
+        t, t_br = result['t'], result['t_br']
+        gyro, gyro_br = result['gyro'], result['gyro_br']
 
         self.ax.clear()
         self.ax.set_axis_off()
@@ -45,20 +54,20 @@ class GyroGraph(GraphTab):
         ax2 = self.fig.add_subplot(gs[1, 0])
         ax3 = self.fig.add_subplot(gs[1, 1])
 
-        ax1.plot(t, gyro[0:int(total_time / dt), 0], label="A1 Avionics")
-        ax1.plot(t_br, gyro_br[0:int(total_time / dt_br), 0], label="Blue Raven")
+        self.plot(ax1, t, gyro[:, 0], label="A1 Avionics")
+        self.plot(ax1, t_br, gyro_br[:, 0], label="Blue Raven")
         ax1.set_xlabel('Time (s)')
         ax1.set_ylabel('X-axis rotational velocity (m/s)')
         ax1.legend()
 
-        ax2.plot(t, gyro[0:int(total_time / dt), 1])
-        ax2.plot(t_br, gyro_br[0:int(total_time / dt_br), 1])
+        self.plot(ax2, t, gyro[:, 1])
+        self.plot(ax2, t_br, gyro_br[:, 1])
         ax2.set_xlabel('Time (s)')
         ax2.set_ylabel('Y-axis rotational velocity (m/s)')
         ax2.legend(["A1 Avionics", "Blue Raven"])
 
-        ax3.plot(t, gyro[0:int(total_time / dt), 2])
-        ax3.plot(t_br, gyro_br[0:int(total_time / dt_br), 2])
+        self.plot(ax3, t, gyro[:, 2])
+        self.plot(ax3, t_br, gyro_br[:, 2])
         ax3.set_xlabel('Time (s)')
         ax3.set_ylabel('Z-axis rotational velocity (m/s)')
         ax3.legend(["A1 Avionics", "Blue Raven"])
@@ -1,57 +1,48 @@
 import matplotlib.gridspec as gridspec
 
-from ..lib.math import Quaternion, Vector3
-from ..graph_tab import GraphTab
+from ..calibration import scaled
+from ..lib.integrate import integrate_rates
+from ..lib.math import QuaternionArray
+from ..datasets import axis_columns
+from ..graph_tab import GraphTab, register_tab
 
 
+@register_tab('gyro_state')
 class GyroStateGraph(GraphTab):
+    requires = {
+        'raven_highres': ('Flight_Time_(s)', *axis_columns('Gyro'), 'Quat_1', 'Quat_2', 'Quat_3', 'Quat_4'),
+    }
+
     def setup(self):
         self.title = "Gyro State"
 
-    def graph(self):
-        data_br = self.data[1]
+    @classmethod
+    def compute(cls, data, args):
+        data_br = data['raven_highres']
 
-        data_count = len(data_br['Flight_Time_(s)'])
         dt = 0.002
-        
+
         t_br = data_br['Flight_Time_(s)']
-        gyro_br = [
-            [x for x in data_br['Gyro_X']],
-            [x for x in data_br['Gyro_Y']],
-            [x for x in data_br['Gyro_Z']]
-        ]
-
-
-        x_est_list = [[0, 0, 0]]
-        for i in range(data_count):
-            gyro_x = gyro_br[0][i] - (-0.12)
-            gyro_y = gyro_br[2][i] - (0.61)
-            gyro_z = gyro_br[1][i] - (-0.59)
-            x_est_list.append([
-                x_est_list[i][0] + dt*gyro_x,
-                x_est_list[i][1] + dt*gyro_y,
-                x_est_list[i][2] + dt*gyro_z
-            ])
-
-        quat = [
-            Quaternion.with_half_euler(x, y, z)
-            for (x, y, z) in x_est_list[1:]
-        ]
-        quat_br = list(zip(
-            data_br["Quat_1"],
-            data_br["Quat_2"],
-            data_br["Quat_3"],
-            data_br["Quat_4"],
-        ))
-        euler = [
-            Quaternion.with_array(quat).as_euler().as_array()
-            for quat in quat_br
-        ]
-
-        estimated_roll = [x[0] for x in x_est_list[1:]]
-        estimated_pitch = [x[1] for x in x_est_list[1:]]
-        estimated_yaw = [x[2] for x in x_est_list[1:]]
+        gyro_br = scaled(data_br, 'BR', 'gyro', axes='xzy', signs=(1, 1, 1), debias=args.get('gyro_bias', False))
+
+        angles = integrate_rates(gyro_br, dt)
+
+        quat = QuaternionArray.with_half_euler(angles[1:])
+        quat_br = data_br[["Quat_1", "Quat_2", "Quat_3", "Quat_4"]].to_numpy()
+
+        # only the first 12 seconds are plotted
+        count = int(12/dt)
+
+        return {
+            't': t_br.to_numpy()[0:count],
+            'quat': quat.data[0:count],
+            'quat_br': quat_br[0:count],
+        }
 
+    def render(self, result):
+        t_br = result['t']
+        quat = QuaternionArray(result['quat'])
+        quat_br = result['quat_br']
 
         self.ax.clear()
         self.ax.set_axis_off()
@@ -71,26 +62,26 @@ class GyroStateGraph(GraphTab):
         # ax1.title("Euler angle estimates")
         # ax1.legend(["Roll", "Pitch", "Yaw"], loc="upper left")
 
-        ax1.plot(t_br[0:int(12/dt)], [x[3] for x in quat[0:int(12/dt)]])
-        ax1.plot(t_br[0:int(12/dt)], [x[0] for x in quat_br[0:int(12/dt)]])
+        self.plot(ax1, t_br, quat.w)
+        self.plot(ax1, t_br, quat_br[:, 0])
         ax1.set_xlabel("Time (s)")
         ax1.set_title("Quaternion w")
         ax1.legend(["Estimated", "Ground truth"], loc="lower left")
 
-        ax2.plot(t_br[0:int(12/dt)], [x[0] for x in quat[0:int(12/dt)]])
-        ax2.plot(t_br[0:int(12/dt)], [x[1] for x in quat_br[0:int(12/dt)]])
+        self.plot(ax2, t_br, quat.x)
+        self.plot(ax2, t_br, quat_br[:, 1])
         ax2.set_xlabel("Time (s)")
         ax2.set_title("Quaternion x")
         ax2.legend(["Estimated", "Ground truth"], loc="lower left")
 
-        ax3.plot(t_br[0:int(12/dt)], [x[2] for x in quat[0:int(12/dt)]])
-        ax3.plot(t_br[0:int(12/dt)], [x[2] for x in quat_br[0:int(12/dt)]])
+        self.plot(ax3, t_br, quat.z)
+        self.plot(ax3, t_br, quat_br[:, 2])
         ax3.set_xlabel("Time (s)")
         ax3.set_title("Quaternion y")
         ax3.legend(["Estimated", "Ground truth"], loc="lower left")
 
-        ax4.plot(t_br[0:int(12/dt)], [x[1] for x in quat[0:int(12/dt)]])
-        ax4.plot(t_br[0:int(12/dt)], [x[3] for x in quat_br[0:int(12/dt)]])
+        self.plot(ax4, t_br, quat.y)
+        self.plot(ax4, t_br, quat_br[:, 3])
         ax4.set_xlabel("Time (s)")
         ax4.set_title("Quaternion z")
         ax4.legend(["Estimated", "Ground truth"], loc="lower left")
@@ -1,52 +1,44 @@
-from math import cos, acos, pi
 import numpy as np
 
-from ..lib.math import Quaternion, Vector3
-from ..graph_tab import GraphTab
+from ..derived import derived
+from ..graph_tab import GraphTab, register_tab
 
 
+@register_tab('tilt')
 class TiltGraph(GraphTab):
+    requires = {'quaternions_AV': None}
+
     def setup(self):
         self.title = "Tilt"
 
-    def graph(self):
-        quat = self.data[5]
-
-        quats = list(zip(
-            quat["x"],
-            quat["y"],
-            quat["z"],
-            quat["w"],
-        ))
-        rotations = [Quaternion.with_array(q) for q in quats]
+    @classmethod
+    def compute(cls, data, args):
+        quat = data['quaternions_AV']
 
-        z = Vector3(0, 0, 1)
-        tilt = []
-        tilt_cosine = []
+        tilt = derived(quat, 'tilt')
+        tilt_cosine = derived(quat, 'tilt_cosine')
 
-        for rotation in rotations:
-            result = rotation.apply(z)
-            dot = np.dot(result.as_array(), z.as_array())
-            dot = min(max(dot, -1.0), 1.0)  # Clamp the value for acos
-            theta = acos(dot)*180/pi
+        return {
+            'time': 0.002 * np.arange(len(tilt)),
+            'tilt': tilt,
+            'tilt_cosine': tilt_cosine,
+        }
 
-            tilt.append(theta)
-            tilt_cosine.append(cos(theta*pi/180))
+    def render(self, result):
+        time, tilt, tilt_cosine = result['time'], result['tilt'], result['tilt_cosine']
 
         self.ax.clear()
         self.ax.set_axis_off()
         self.ax.set_title("Aurora I body-axis tilt")
 
-        time = [t * 0.002 for t in range(len(rotations))]
-
         ax1, ax2 = self.fig.subplots(2, 1)        
-        ax1.plot(time, tilt, label="Tilt (degrees)", linewidth=0.4)
+        self.plot(ax1, time, tilt, label="Tilt (degrees)", linewidth=0.4)
         ax1.set_xlabel("Time (s)")
         ax1.set_ylabel("Tilt (degrees)")
         ax1.legend(loc="upper left")
 
         # Create a secondary y-axis for tilt cosine
-        ax2.plot(time, tilt_cosine, color="orange", label="Tilt Cosine", linewidth=0.4)
+        self.plot(ax2, time, tilt_cosine, color="orange", label="Tilt Cosine", linewidth=0.4)
         ax2.set_ylabel("Tilt Cosine")
         ax2.legend(loc="upper right")
         
@@ -1,37 +1,49 @@
-from ..graph_tab import GraphTab
+import numpy as np
 
+from ..calibration import scaled, G, FEET_PER_METRE
+from ..datasets import axis_columns
+from ..graph_tab import GraphTab, register_tab
 
+
+@register_tab('velocity')
 class VelocityGraph(GraphTab):
+    requires = {
+        'highres': ('Tilt_Cosine', *axis_columns('Accel')),
+        'raven_lowres': ('Flight_Time_(s)', 'Velocity_Up'),
+    }
+
     def setup(self):
         self.title = "Velocity"
 
-    def graph(self):
-        data = self.data[0]
-        data_br = self.data[3]
+    @classmethod
+    def compute(cls, data, args):
+        data_br = data['raven_lowres']
+        data = data['highres']
 
-        cosines = data["Tilt_Cosine"]
-        accel_x = data["Accel_X"]
+        cosines = data["Tilt_Cosine"].to_numpy()
 
-        sensitivity = 31 / 1000   # mG/LSB (converted to g)
         dt = 0.004                # Time step (seconds)
-        t = [t*dt for t in range(len(accel_x))]
 
-        # Extract and scale accelerometer data
-        accel_data = [x * sensitivity * 9.81 for x in accel_x]
-        velocity_x = []
-        vel = 0
+        # Extract and scale accelerometer data (logged x axis)
+        accel_data = scaled(data, 'AV', 'accel')[:, 2]
+        t = dt * np.arange(len(accel_data))
 
         # Perform numerical integration to calculate x-axis velocity
-        for i in range(len(accel_x)):
-            if i >= 11.57/0.004:
-                vel += (accel_data[i] * cosines[i]) * 3.28 * dt
-            else:
-                vel += (accel_data[i] * cosines[i] - 9.81) * 3.28 * dt
-            velocity_x.append(vel)
-
+        vertical = accel_data * cosines
+        vertical[:int(np.ceil(11.57/0.004))] -= G
+        velocity_x = np.cumsum(vertical * FEET_PER_METRE * dt)
+
+        return {
+            't': t,
+            'velocity': velocity_x,
+            't_br': data_br["Flight_Time_(s)"].to_numpy(),
+            'velocity_br': data_br["Velocity_Up"].to_numpy(),
+        }
+
+    def render(self, result):
         # Plot the results
-        self.ax.plot(t, velocity_x)  # Plot time on x-axis
-        self.ax.plot(data_br["Flight_Time_(s)"], data_br["Velocity_Up"])
+        self.plot(self.ax, result['t'], result['velocity'])  # Plot time on x-axis
+        self.plot(self.ax, result['t_br'], result['velocity_br'])
         self.ax.set_xlabel('Time (seconds)')
         self.ax.set_ylabel('X-Axis Velocity (g)')
         self.ax.set_title('X-Axis Velocity from Accelerometer Data')
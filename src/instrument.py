@@ -0,0 +1,234 @@
+import atexit
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+
+# Set AVIONICS_PROFILE to a trace path (or 1 for profile.json) to enable at
+# import, AVIONICS_PROFILE_MEMORY=0 skips memory tracing
+ENV_VAR = 'AVIONICS_PROFILE'
+ENV_MEMORY_VAR = 'AVIONICS_PROFILE_MEMORY'
+DEFAULT_TRACE_PATH = 'profile.json'
+
+# summary lines printed at exit
+SUMMARY_ROWS = 20
+
+_enabled = False
+_memory = False
+_path = None
+_events = []
+_epoch = 0.0
+# process recording was set up in, by enable() or init_worker()
+_pid = None
+_worker = False
+_local = threading.local()
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('name', 'meta', 'start', 'start_memory', 'peak_memory')
+
+    def __init__(self, name: str, meta: dict):
+        self.name = name
+        self.meta = meta
+
+    def __enter__(self):
+        stack = _stack()
+        if _memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # the enclosing span keeps the peak seen so far before it is reset
+            if stack:
+                stack[-1].peak_memory = max(stack[-1].peak_memory, peak)
+            tracemalloc.reset_peak()
+            self.start_memory = self.peak_memory = current
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        stack = _stack()
+        stack.pop()
+
+        args = dict(self.meta)
+        if _memory:
+            current, peak = tracemalloc.get_traced_memory()
+            self.peak_memory = max(self.peak_memory, peak)
+            if stack:
+                stack[-1].peak_memory = max(stack[-1].peak_memory, self.peak_memory)
+            tracemalloc.reset_peak()
+            args['peak_mb'] = (self.peak_memory - self.start_memory) / (1024 * 1024)
+            args['retained_mb'] = (current - self.start_memory) / (1024 * 1024)
+
+        # Chrome trace complete event, times in microseconds
+        _events.append({
+            'name': self.name,
+            'ph': 'X',
+            'ts': (self.start - _epoch) * 1e6,
+            'dur': (end - self.start) * 1e6,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': args,
+        })
+        return False
+
+
+def _stack() -> list:
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(path: str | None = None, memory: bool = True):
+    """
+    Starts recording spans. The trace is written to `path` and a summary
+    printed when the process exits.
+
+    Args:
+        path (str | None): Chrome trace output, defaults to profile.json
+        memory (bool): Also record peak memory per span with tracemalloc
+    """
+    global _enabled, _memory, _path, _epoch, _pid
+    if _enabled:
+        return
+
+    _enabled = True
+    _memory = memory
+    _path = path or DEFAULT_TRACE_PATH
+    _epoch = time.perf_counter()
+    _pid = os.getpid()
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    atexit.register(_finish, os.getpid())
+
+
+def worker_state() -> tuple | None:
+    """
+    Returns:
+        What init_worker() needs to record spans in a pool worker, None
+        when recording is off
+    """
+    return (_epoch,) if _enabled else None
+
+
+def init_worker(state: tuple | None):
+    """
+    Sets up a pool worker, call it from the pool's initializer with the
+    parent's worker_state(). Workers record spans without memory tracing,
+    as a forked worker inherits tracemalloc and it slows allocation heavy
+    stages several times over. Their events are kept until collect()
+    returns them with a task's result. Does nothing in the process that
+    recording was set up in, so initializers can also run in-process.
+    """
+    global _enabled, _memory, _epoch, _pid, _worker
+    if os.getpid() == _pid:
+        return
+
+    _pid = os.getpid()
+    _worker = True
+    _memory = False
+    _events.clear()
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+    _enabled = state is not None
+    if state is not None:
+        (_epoch,) = state
+
+
+def collect() -> list:
+    """
+    Returns:
+        The events a pool worker recorded since the last call, for merge()
+        in the parent. Empty outside of workers
+    """
+    if not _worker:
+        return []
+
+    events = _events[:]
+    _events.clear()
+    return events
+
+
+def merge(events: list):
+    """
+    Adds events collected in a pool worker to this process's trace. Both
+    time spans from the parent's start, so they line up in the trace.
+    """
+    _events.extend(events)
+
+
+def span(name: str, **meta):
+    """
+    Context manager timing a stage. Spans nest, and with memory tracing
+    each records the peak allocated above its start. Costs one call and a
+    flag check when instrumentation is disabled.
+
+    Args:
+        name (str): Stage name, spans with the same name are summed
+        **meta: Extra values stored with the event
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, meta)
+
+
+def summary(events: list) -> str:
+    """
+    Returns:
+        A table of total, mean and max time and peak memory per span name,
+        slowest first
+    """
+    stats = {}
+    for event in events:
+        entry = stats.setdefault(event['name'], [0, 0.0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += event['dur'] / 1e3
+        entry[2] = max(entry[2], event['dur'] / 1e3)
+        entry[3] = max(entry[3], event['args'].get('peak_mb', 0.0))
+
+    lines = [f"{'span':<40}{'count':>7}{'total ms':>11}{'mean ms':>10}{'max ms':>10}{'peak MB':>9}"]
+    rows = sorted(stats.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (count, total, longest, peak) in rows[:SUMMARY_ROWS]:
+        lines.append(f"{name[:39]:<40}{count:>7}{total:>11.1f}{total / count:>10.2f}{longest:>10.1f}{peak:>9.1f}")
+    if len(rows) > SUMMARY_ROWS:
+        lines.append(f"... {len(rows) - SUMMARY_ROWS} more in the trace")
+
+    return "\n".join(lines)
+
+
+def _finish(pid: int):
+    # forked workers inherit the atexit hook, only the parent writes
+    if os.getpid() != pid or not _events:
+        return
+
+    with open(_path, 'w') as f:
+        json.dump({'traceEvents': _events, 'displayTimeUnit': 'ms'}, f)
+
+    print(summary(_events))
+    print(f"Trace written to {_path} (open in chrome://tracing or ui.perfetto.dev)")
+
+
+if os.environ.get(ENV_VAR):
+    value = os.environ[ENV_VAR]
+    enable(None if value == '1' else value, memory=os.environ.get(ENV_MEMORY_VAR, '1') != '0')
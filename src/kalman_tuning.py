@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .lib.kalman import kalman_filter
+from . import instrument
+
+
+# Bump when the objective below changes meaning, so old results are not reused
+OBJECTIVE_VERSION = 1
+
+# Candidates suggested per round. Fixed rather than the pool size, as the
+# suggestions (and so the tuned parameters) depend on it
+SUGGEST_BATCH = 4
+
+# Set in each worker by _init_worker so the measurements are sent once per process
+_problem = None
+
+
+def _set_problem(z, target, dt, skip):
+    global _problem
+    _problem = (z, target, dt, skip)
+
+
+def _init_worker(z, target, dt, skip):
+    # the objective records no spans
+    instrument.init_worker(None)
+    _set_problem(z, target, dt, skip)
+
+
+def _objective(params: dict) -> float:
+    """
+    Negative velocity RMSE of one filter run against the target velocity
+    from sample `skip` onwards. Diverging runs score -1000.
+    """
+    z, target, dt, skip = _problem
+    try:
+        x_est, _ = kalman_filter(
+            z, dt,
+            (params['q0'], params['q1'], params['q2']),
+            (params['r0'], params['r1']),
+            covariance=False, steady_state=True
+        )
+        error = np.sqrt(np.mean((target[skip:] - x_est[skip:len(target), 1])**2))
+    except (ZeroDivisionError, OverflowError, ValueError):
+        return -1000.0
+
+    if not np.isfinite(error):
+        return -1000.0
+
+    return -float(error)
+
+
+def _tuning_key(z, target, dt, skip, bounds, init_points, n_iter, random_state, batch_size) -> str:
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(z, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(target, dtype=np.float64).tobytes())
+    digest.update(json.dumps({
+        'objective': OBJECTIVE_VERSION,
+        'dt': dt,
+        'skip': skip,
+        'bounds': bounds,
+        'init_points': init_points,
+        'n_iter': n_iter,
+        'random_state': random_state,
+        'batch_size': batch_size,
+    }, sort_keys=True).encode())
+
+    return f"kalman_{digest.hexdigest()}"
+
+
+def tune_kalman(
+    z: np.ndarray,
+    target: np.ndarray,
+    dt: float,
+    bounds: dict,
+    skip: int = 0,
+    init_points: int = 5,
+    n_iter: int = 10,
+    random_state: int = 1,
+    batch_size: int = SUGGEST_BATCH,
+    workers: int | None = None,
+    cache=None,
+) -> dict:
+    """
+    Finds the Kalman noise parameters (q0, q1, q2, r0, r1) that best match a
+    target velocity using Bayesian optimisation.
+
+    Candidates are suggested in batches of `batch_size` (constant liar)
+    and evaluated on a process pool. The result does not depend on the
+    number of workers. The best parameters are stored in `cache`, keyed by a hash
+    of the measurements, target, bounds and objective, so repeat runs return
+    immediately.
+
+    Args:
+        z (np.ndarray): (N,2) altitude and acceleration measurements
+        target (np.ndarray): Velocity the estimate is scored against
+        dt (float): Time interval between measurements
+        bounds (dict): Search bounds for each parameter
+        skip (int): Number of leading samples excluded from the score
+        init_points (int): Random points probed first
+        n_iter (int): Number of suggested points probed after that
+        random_state (int): Seed for the optimiser
+        batch_size (int): Candidates suggested per round
+        workers (int | None): Worker processes, defaults to all cores (at
+            most batch_size are used after the random points)
+        cache (DataCache | None): Where results are persisted
+    Returns:
+        A dict of the best parameters
+    """
+    z = np.asarray(z, dtype=np.float64)
+    target = np.asarray(target, dtype=np.float64)
+    bounds = {k: tuple(v) for k, v in bounds.items()}
+
+    key = _tuning_key(z, target, dt, skip, bounds, init_points, n_iter, random_state, batch_size)
+    if cache is not None:
+        result = cache.load_json(key)
+        if result is not None:
+            return result['params']
+
+    from bayes_opt import BayesianOptimization
+    from bayes_opt.acquisition import ConstantLiar, UpperConfidenceBound
+
+    optimizer = BayesianOptimization(
+        f=None,
+        pbounds=bounds,
+        acquisition_function=ConstantLiar(UpperConfidenceBound(random_state=random_state)),
+        random_state=random_state,
+        verbose=0,
+    )
+
+    workers = max(1, min(workers or os.cpu_count() or 1, max(init_points, batch_size)))
+    initargs = (z, target, dt, skip)
+
+    def evaluate(points, pool):
+        with instrument.span("tune_kalman.evaluate", points=len(points)):
+            if pool is None:
+                return [_objective(p) for p in points]
+            return list(pool.map(_objective, points))
+
+    def run(pool):
+        points = optimizer.random_sample(init_points)
+        for params, score in zip(points, evaluate(points, pool)):
+            optimizer.register(params=params, target=score)
+
+        remaining = n_iter
+        while remaining > 0:
+            with instrument.span("tune_kalman.suggest"):
+                batch = [optimizer.suggest() for _ in range(min(batch_size, remaining))]
+            for params, score in zip(batch, evaluate(batch, pool)):
+                optimizer.register(params=params, target=score)
+            remaining -= len(batch)
+
+    with instrument.span("tune_kalman", workers=workers):
+        if workers == 1:
+            # not _init_worker, which would put this process in worker mode
+            _set_problem(*initargs)
+            run(None)
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as pool:
+                run(pool)
+
+    best = optimizer.max
+    params = {k: float(v) for k, v in best['params'].items()}
+    if cache is not None:
+        cache.store_json(key, {'params': params, 'target': float(best['target'])})
+
+    return params
@@ -0,0 +1,84 @@
+import numpy as np
+
+
+def minmax_decimate(x: np.ndarray, y: np.ndarray, x0: float, x1: float, bins: int) -> tuple:
+    """
+    Reduces the samples visible in [x0, x1] to the minimum and maximum of
+    each of `bins` equal groups, keeping them in x order. A line through
+    the result covers the same pixels as one through every sample.
+
+    Args:
+        x: Sorted sample positions.
+        y: Sample values.
+        x0: Left edge of the visible range.
+        x1: Right edge of the visible range.
+        bins: Number of groups, normally the axes width in pixels.
+    Returns:
+        A tuple of the decimated (x, y) arrays.
+    """
+
+    # one extra sample either side so the line reaches the axes edges
+    start = max(np.searchsorted(x, x0, side='left') - 1, 0)
+    stop = min(np.searchsorted(x, x1, side='right') + 1, len(x))
+
+    count = stop - start
+    if count <= 2 * bins:
+        return x[start:stop], y[start:stop]
+
+    size = count // bins
+    end = start + bins * size
+    groups = y[start:end].reshape(bins, size)
+
+    offsets = start + size * np.arange(bins)
+    first = offsets + np.argmin(groups, axis=1)
+    second = offsets + np.argmax(groups, axis=1)
+    indices = np.column_stack([
+        np.minimum(first, second),
+        np.maximum(first, second)
+    ]).ravel()
+    # samples that did not fill a whole group are kept as they are
+    indices = np.concatenate([indices, np.arange(end, stop)])
+
+    return x[indices], y[indices]
+
+
+def plot_decimated(ax, x, y, *args, **kwargs):
+    """
+    ax.plot for long series: draws a per-pixel min/max reduction and
+    re-decimates from the full resolution data whenever the x limits
+    change or the figure is resized, so zooming in still shows every
+    sample.
+
+    Args:
+        ax: Axes to plot on.
+        x: Sample positions.
+        y: Sample values.
+        *args: Passed to ax.plot.
+        **kwargs: Passed to ax.plot.
+    Returns:
+        The Line2D that was added.
+    """
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # decimation needs sorted x, fall back to plotting everything
+    if len(x) < 2 or np.any(np.diff(x) < 0):
+        line, = ax.plot(x, y, *args, **kwargs)
+        return line
+
+    def bins():
+        return max(int(ax.bbox.width), 1)
+
+    line, = ax.plot(*minmax_decimate(x, y, x[0], x[-1], bins()), *args, **kwargs)
+
+    def redecimate(*_):
+        x0, x1 = sorted(ax.get_xlim())
+        line.set_data(*minmax_decimate(x, y, x0, x1, bins()))
+
+    ax.callbacks.connect('xlim_changed', redecimate)
+    # canvas callbacks are kept by the figure, so this still fires after
+    # the figure is attached to another canvas (FigureCanvasTkAgg)
+    ax.figure.canvas.mpl_connect('resize_event', redecimate)
+
+    return line
@@ -0,0 +1,157 @@
+import numpy as np
+
+from .math import QuaternionArray
+
+
+def prefix_product(q: np.ndarray) -> np.ndarray:
+    """
+    Computes the running product q[0] * q[1] * ... * q[i] for every i.
+
+    Uses a log-depth scan so every step is a bulk array operation rather
+    than a per-sample Python call. Results are normalised after each level
+    to keep rounding from accumulating.
+
+    Args:
+        q: (N,4) array of (x, y, z, w) quaternions.
+    Returns:
+        An (N,4) array of running products.
+    """
+
+    out = np.array(q, dtype=np.float64)
+    step = 1
+    while step < len(out):
+        product = QuaternionArray(out[:-step]).multiply(QuaternionArray(out[step:]))
+        out[step:] = product.normalise().data
+        step *= 2
+
+    return out
+
+
+def integrate_rates(rates: np.ndarray, dt: float, initial=(0.0, 0.0, 0.0)) -> np.ndarray:
+    """
+    Integrates rates into angles with a cumulative sum, each step adding
+    dt times the rate of the sample before it.
+
+    Args:
+        rates: (N,3) array of rates.
+        dt: Time step between samples in seconds.
+        initial: Starting angles.
+    Returns:
+        An (N+1,3) array of angles, starting with `initial`.
+    """
+
+    angles = np.empty((len(rates) + 1, 3))
+    angles[0] = initial
+    np.cumsum(np.asarray(rates) * dt, axis=0, out=angles[1:])
+    angles[1:] += angles[0]
+
+    return angles
+
+
+# increment methods accepted by integrate_gyro
+INTEGRATORS = ('half_euler', 'exp', 'coning')
+
+
+def rotation_increments(gyro: np.ndarray, dt: float, method: str = 'half_euler', decimate: int = 1) -> QuaternionArray:
+    """
+    Builds the rotation of each integration step from gyro samples.
+
+    'half_euler' treats the step's angles as Euler angles (the original
+    small angle increment), 'exp' uses the exact exponential map of the
+    step's rotation vector and 'coning' adds the second order coning
+    correction between the samples combined into a step, which keeps
+    accuracy when decimating.
+
+    Args:
+        gyro: (N,3) array of angular rates in degrees per second.
+        dt: Time step between samples in seconds.
+        method: One of INTEGRATORS.
+        decimate: Samples combined into each step. A final partial step
+            is padded with zero rates.
+    Returns:
+        The ceil(N/decimate) step rotations.
+    """
+
+    if method not in INTEGRATORS:
+        raise ValueError(f"Unknown integrator '{method}', expected one of {', '.join(INTEGRATORS)}")
+    if decimate < 1:
+        raise ValueError(f"decimate must be at least 1, got {decimate}")
+
+    angles = np.asarray(gyro, dtype=np.float64).reshape(-1, 3) * dt
+
+    if decimate > 1:
+        steps = -(-len(angles) // decimate)
+        padded = np.zeros((steps * decimate, 3))
+        padded[:len(angles)] = angles
+        samples = padded.reshape(steps, decimate, 3)
+
+        angles = samples.sum(axis=1)
+        if method == 'coning':
+            # rotation of the step so far crossed with each sample's (Bortz)
+            before = np.cumsum(samples, axis=1) - samples
+            coning = 0.5 * np.cross(before, samples).sum(axis=1)
+            # the cross product of degrees needs scaling back to degrees
+            angles += coning * (np.pi / 180.0)
+
+    if method == 'half_euler':
+        return QuaternionArray.with_half_euler(angles)
+    return QuaternionArray.with_rotation_vector(angles)
+
+
+def integrate_gyro(gyro: np.ndarray, dt: float, initial=(0.0, 0.0, 0.0, 1.0), method: str = 'half_euler', decimate: int = 1) -> np.ndarray:
+    """
+    Integrates a gyro stream into orientation quaternions.
+
+    With the default method each sample's increment matches
+    `Quaternion.with_half_euler(dt*x, dt*y, dt*z)`, see
+    rotation_increments for the others.
+
+    Args:
+        gyro: (N,3) array of angular rates in degrees per second.
+        dt: Time step between samples in seconds.
+        initial: Starting orientation as (x, y, z, w).
+        method: One of INTEGRATORS.
+        decimate: Samples combined into each step.
+    Returns:
+        An (M+1,4) array of (x, y, z, w) quaternions, starting with
+        `initial`, at every decimate'th sample (M = ceil(N/decimate)).
+    """
+
+    increments = rotation_increments(gyro, dt, method, decimate)
+
+    quats = np.empty((len(increments) + 1, 4))
+    quats[0] = initial
+    quats[1:] = increments.data
+
+    return prefix_product(quats)
+
+
+def upsample(quats: np.ndarray, decimate: int, count: int) -> np.ndarray:
+    """
+    Fills in the samples between decimated orientations by normalised
+    linear interpolation.
+
+    Args:
+        quats: (M+1,4) output of integrate_gyro with the same decimate.
+        decimate: Samples combined into each step.
+        count: Number of gyro samples that were integrated.
+    Returns:
+        An (count+1,4) array, one orientation per sample like
+        integrate_gyro without decimation.
+    """
+
+    if decimate == 1 or len(quats) < 2:
+        return quats
+
+    index = np.arange(count + 1)
+    step = np.minimum(index // decimate, len(quats) - 2)
+    # a final partial step ends at the last sample
+    length = np.minimum((step + 1) * decimate, count) - step * decimate
+    fraction = ((index - step * decimate) / np.maximum(length, 1))[:, None]
+
+    start = quats[step]
+    end = quats[step + 1]
+    # take the short way round
+    end = np.where(np.einsum('ij,ij->i', start, end)[:, None] < 0, -end, end)
+
+    return QuaternionArray((1 - fraction) * start + fraction * end).normalise().data
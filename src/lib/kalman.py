@@ -0,0 +1,121 @@
+import numpy as np
+
+
+def kalman_filter(
+    z: np.ndarray,
+    dt: float,
+    q: tuple,
+    r: tuple,
+    x0: tuple = (0.0, 0.0, 0.0),
+    P0: tuple = (1.0, 0.1, 100.0),
+    covariance: bool = True,
+    steady_state: bool = False,
+    tol: float = 1e-12,
+) -> tuple:
+    """
+    Runs a constant acceleration Kalman filter over altitude and
+    acceleration measurements.
+
+    The state is (altitude, velocity, acceleration) with
+    F = [[1, dt, dt^2/2], [0, 1, dt], [0, 0, 1]] and H selecting altitude
+    and acceleration. The symmetric covariance is tracked as six scalars and
+    the 2x2 innovation covariance is inverted in closed form, so a step
+    allocates no arrays.
+
+    Args:
+        z: (N,2) array of (altitude, acceleration) measurements.
+        dt: Time interval between measurements.
+        q: Process noise (q0, q1, q2), the diagonal of Q.
+        r: Measurement noise (r0, r1), the diagonal of R.
+        x0: Initial state.
+        P0: Diagonal of the initial covariance.
+        covariance: Whether to return the (N,3,3) covariance history.
+        steady_state: Freeze the gain once it stops changing by more than
+            `tol` and skip covariance propagation from then on.
+        tol: Gain convergence threshold for `steady_state`.
+    Returns:
+        A tuple of the (N,3) state estimates and the (N,3,3) covariances
+        (None when `covariance` is False).
+    Raises:
+        ZeroDivisionError: If the innovation covariance becomes singular.
+    """
+
+    q0, q1, q2 = map(float, q)
+    r0, r1 = map(float, r)
+    h = 0.5 * dt * dt
+
+    x_a, x_v, x_c = map(float, x0)
+    p00, p11, p22 = map(float, P0)
+    p01 = p02 = p12 = 0.0
+
+    z = np.asarray(z, dtype=np.float64)
+    count = len(z)
+    x_out = np.empty((count, 3))
+    P_out = np.empty((count, 3, 3)) if covariance else None
+
+    k00 = k01 = k10 = k11 = k20 = k21 = 0.0
+    converged = False
+
+    for i, (z_a, z_c) in enumerate(z.tolist()):
+        # Prediction step
+        x_a += dt * x_v + h * x_c
+        x_v += dt * x_c
+
+        if not converged:
+            # P = F @ P @ F.T + Q
+            a00 = p00 + dt * p01 + h * p02
+            a01 = p01 + dt * p11 + h * p12
+            a02 = p02 + dt * p12 + h * p22
+            a11 = p11 + dt * p12
+            a12 = p12 + dt * p22
+            p00 = a00 + dt * a01 + h * a02 + q0
+            p01 = a01 + dt * a02
+            p02 = a02
+            p11 = a11 + dt * a12 + q1
+            p12 = a12
+            p22 = p22 + q2
+
+            # K = P @ H.T @ inv(H @ P @ H.T + R)
+            s00 = p00 + r0
+            s11 = p22 + r1
+            det = s00 * s11 - p02 * p02
+            i00 = s11 / det
+            i01 = -p02 / det
+            i11 = s00 / det
+            n00 = p00 * i00 + p02 * i01
+            n01 = p00 * i01 + p02 * i11
+            n10 = p01 * i00 + p12 * i01
+            n11 = p01 * i01 + p12 * i11
+            n20 = p02 * i00 + p22 * i01
+            n21 = p02 * i01 + p22 * i11
+
+            if steady_state:
+                change = max(
+                    abs(n00 - k00), abs(n01 - k01), abs(n10 - k10),
+                    abs(n11 - k11), abs(n20 - k20), abs(n21 - k21)
+                )
+                converged = change < tol
+            k00, k01, k10, k11, k20, k21 = n00, n01, n10, n11, n20, n21
+
+            # P = (I - K @ H) @ P
+            p00, p01, p02, p11, p12, p22 = (
+                p00 - k00 * p00 - k01 * p02,
+                p01 - k00 * p01 - k01 * p12,
+                p02 - k00 * p02 - k01 * p22,
+                p11 - k10 * p01 - k11 * p12,
+                p12 - k10 * p02 - k11 * p22,
+                p22 - k20 * p02 - k21 * p22,
+            )
+
+        # Measurement update step
+        y_a = z_a - x_a
+        y_c = z_c - x_c
+        x_a += k00 * y_a + k01 * y_c
+        x_v += k10 * y_a + k11 * y_c
+        x_c += k20 * y_a + k21 * y_c
+
+        x_out[i] = (x_a, x_v, x_c)
+        if covariance:
+            P_out[i] = ((p00, p01, p02), (p01, p11, p12), (p02, p12, p22))
+
+    return x_out, P_out
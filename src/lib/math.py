@@ -1,8 +1,13 @@
 import math
 
+import numpy as np
+
 
 #MARK: Quaternion
 class Quaternion:
+    __slots__ = ('x', 'y', 'z', 'w')
+    _FIELDS = ('x', 'y', 'z', 'w')
+
     def __init__(self, x: float = 0.0, y: float = 0.0, z: float = 0.0, w: float = 1.0):
         self.x = x
         self.y = y
@@ -20,16 +25,18 @@ class Quaternion:
         return self.__array__()
 
     def __iter__(self):
-        for val in self.__array__():
-            yield val
+        yield self.x
+        yield self.y
+        yield self.z
+        yield self.w
 
     def __getitem__(self, key: int) -> float:
-        if key >= len(self):
+        if key >= 4:
             raise KeyError
-        return self.__array__()[key]
+        return getattr(self, self._FIELDS[key])
 
     def __len__(self) -> int:
-        return len(self.__array__())
+        return 4
 
     def normalise(self) -> 'Quaternion':
         """
@@ -187,6 +194,9 @@ class Quaternion:
 
 #MARK: Vector3
 class Vector3():
+    __slots__ = ('x', 'y', 'z')
+    _FIELDS = ('x', 'y', 'z')
+
     def __init__(self, x: float = 0.0, y: float = 0.0, z: float = 0.0):
         self.x = x
         self.y = y
@@ -203,16 +213,17 @@ class Vector3():
         return self.__array__()
 
     def __iter__(self):
-        for x in self.__array__():
-            yield x
+        yield self.x
+        yield self.y
+        yield self.z
 
     def __getitem__(self, key: int) -> float:
-        if key >= len(self):
+        if key >= 3:
             raise KeyError
-        return self.__array__()[key]
+        return getattr(self, self._FIELDS[key])
 
     def __len__(self) -> int:
-        return len(self.__array__())
+        return 3
 
     def with_array(array: list) -> 'Vector3':
         """
@@ -228,4 +239,305 @@ class Vector3():
             array[0],
             array[1],
             array[2]
-        )
\ No newline at end of file
+        )
+
+
+#MARK: QuaternionArray
+class QuaternionArray:
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        """
+        A series of quaternions backed by a contiguous (N,4) array of
+        (x, y, z, w), following the same conventions as Quaternion.
+        """
+        self.data = np.ascontiguousarray(data, dtype=np.float64).reshape(-1, 4)
+
+    def __str__(self) -> str:
+        return f"QuaternionArray({len(self)})"
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        if dtype is None:
+            return self.data
+        return self.data.astype(dtype)
+
+    def as_array(self) -> np.ndarray:
+        return self.data
+
+    def __iter__(self):
+        for x, y, z, w in self.data.tolist():
+            yield Quaternion(x, y, z, w)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return Quaternion(*self.data[key].tolist())
+        return QuaternionArray(self.data[key])
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.data[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.data[:, 1]
+
+    @property
+    def z(self) -> np.ndarray:
+        return self.data[:, 2]
+
+    @property
+    def w(self) -> np.ndarray:
+        return self.data[:, 3]
+
+    def normalise(self) -> 'QuaternionArray':
+        """
+        Normalises every quaternion in place.
+
+        Returns:
+            The normalised series.
+        """
+
+        q = self.data
+        length = np.sqrt(np.einsum('ij,ij->i', q, q))
+
+        zero = length == 0.0
+        if np.any(zero):
+            q[zero] = (0.0, 0.0, 0.0, 1.0)
+            length[zero] = 1.0
+        q /= length[:, None]
+
+        return self
+
+    def multiply(self, other) -> 'QuaternionArray':
+        """
+        Multiplies each quaternion by the matching one in other.
+
+        Args:
+            other: A QuaternionArray of the same length, or a Quaternion.
+        Returns:
+            A resulting series from the multiplication.
+        """
+
+        p = self.data
+        t = np.asarray(other.as_array(), dtype=np.float64).reshape(-1, 4)
+
+        px, py, pz, pw = p[:, 0], p[:, 1], p[:, 2], p[:, 3]
+        tx, ty, tz, tw = t[:, 0], t[:, 1], t[:, 2], t[:, 3]
+
+        result = np.empty((max(len(p), len(t)), 4))
+        result[:, 0] = (pw * tx) + (px * tw) + (py * tz) + (-pz * ty)
+        result[:, 1] = (pw * ty) + (-px * tz) + (py * tw) + (pz * tx)
+        result[:, 2] = (pw * tz) + (px * ty) + (-py * tx) + (pz * tw)
+        result[:, 3] = (pw * tw) + (-px * tx) + (-py * ty) + (-pz * tz)
+
+        return QuaternionArray(result)
+
+    def apply(self, vector) -> 'Vector3Array':
+        """
+        Applies each quaternion rotation to a 3D vector.
+
+        Args:
+            vector: A Vector3 applied to every quaternion, or a Vector3Array
+                of the same length.
+        Returns:
+            The rotated vectors.
+        """
+
+        q = self.data
+        qx, qy, qz, qw = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+
+        v = np.asarray(vector.as_array(), dtype=np.float64).reshape(-1, 3)
+        vx, vy, vz = v[:, 0], v[:, 1], v[:, 2]
+
+        tx = 2 * (qy * vz - qz * vy)
+        ty = 2 * (qz * vx - qx * vz)
+        tz = 2 * (qx * vy - qy * vx)
+
+        result = np.empty((max(len(q), len(v)), 3))
+        result[:, 0] = vx + qw * tx + qy * tz - qz * ty
+        result[:, 1] = vy + qw * ty + qz * tx - qx * tz
+        result[:, 2] = vz + qw * tz + qx * ty - qy * tx
+
+        return Vector3Array(result)
+
+    def with_half_euler(angles) -> 'QuaternionArray':
+        """
+        Initializes a series of quaternions from half Euler angles.
+
+        Args:
+            angles: (N,3) array of roll, pitch and yaw angles in degrees.
+        Returns:
+            The initialized series.
+        """
+
+        # Half the degree and convert it to radians
+        half = np.asarray(angles, dtype=np.float64).reshape(-1, 3) * (np.pi / 360.0)
+
+        s = np.sin(half)
+        c = np.cos(half)
+        s_x, s_y, s_z = s[:, 0], s[:, 1], s[:, 2]
+        c_x, c_y, c_z = c[:, 0], c[:, 1], c[:, 2]
+
+        result = np.empty((len(half), 4))
+        result[:, 0] = s_x * c_y * c_z - c_x * s_y * s_z
+        result[:, 1] = c_x * s_y * c_z + s_x * c_y * s_z
+        result[:, 2] = c_x * c_y * s_z - s_x * s_y * c_z
+        result[:, 3] = c_x * c_y * c_z + s_x * s_y * s_z
+
+        return QuaternionArray(result)
+
+    def with_rotation_vector(angles) -> 'QuaternionArray':
+        """
+        Initializes a series of quaternions from rotation vectors, the
+        exact rotation of a constant angular rate over a time step.
+
+        Args:
+            angles: (N,3) array of rotation vectors in degrees.
+        Returns:
+            The initialized series.
+        """
+
+        half = np.asarray(angles, dtype=np.float64).reshape(-1, 3) * (np.pi / 360.0)
+        angle = np.sqrt(np.einsum('ij,ij->i', half, half))
+
+        # sin(a)/a, written with sinc so zero rotations stay exact
+        result = np.empty((len(half), 4))
+        result[:, :3] = half * np.sinc(angle / np.pi)[:, None]
+        result[:, 3] = np.cos(angle)
+
+        return QuaternionArray(result)
+
+    def with_array(array) -> 'QuaternionArray':
+        """
+        Initializes a series of quaternions from an array.
+
+        Args:
+            array: (N,4) array of (x, y, z, w)
+        Returns:
+            The initialized series.
+        """
+
+        return QuaternionArray(array)
+
+    def as_euler(self, degrees=False) -> 'Vector3Array':
+        """
+        Converts each quaternion to a Euler Vector.
+
+        Returns:
+            A Vector3Array containing the Euler angles in radians.
+        """
+        q = self.data
+        x, y, z, w = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+
+        result = np.empty((len(q), 3))
+
+        sinr_cosp = 2 * (w * x + y * z)
+        cosr_cosp = 1 - 2 * (x * x + y * y)
+        result[:, 0] = np.arctan2(sinr_cosp, cosr_cosp)
+
+        sinp = 2 * (w * y - z * x)
+        result[:, 1] = np.where(
+            np.abs(sinp) >= 1,
+            np.copysign(np.pi / 2, sinp),
+            np.arcsin(np.clip(sinp, -1, 1))
+        )
+
+        siny_cosp = 2 * (w * z + x * y)
+        cosy_cosp = 1 - 2 * (y * y + z * z)
+        result[:, 2] = np.arctan2(siny_cosp, cosy_cosp)
+
+        if degrees:
+            result *= 180 / math.pi
+
+        return Vector3Array(result)
+
+    def as_matrix(self) -> np.ndarray:
+        """
+        Converts each quaternion to a rotation matrix, normalising first.
+
+        Returns:
+            An (N,3,3) array of rotation matrices, R @ v rotates v.
+        """
+        q = self.data
+        # 2/|q|^2 folds the normalisation into the products below
+        s = 2 / np.einsum('ij,ij->i', q, q)
+        x, y, z, w = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+
+        xs, ys, zs = x * s, y * s, z * s
+        xx, yy, zz = x * xs, y * ys, z * zs
+        xy, xz, yz = x * ys, x * zs, y * zs
+        wx, wy, wz = w * xs, w * ys, w * zs
+
+        result = np.empty((len(q), 3, 3))
+        result[:, 0, 0] = 1 - (yy + zz)
+        result[:, 0, 1] = xy - wz
+        result[:, 0, 2] = xz + wy
+        result[:, 1, 0] = xy + wz
+        result[:, 1, 1] = 1 - (xx + zz)
+        result[:, 1, 2] = yz - wx
+        result[:, 2, 0] = xz - wy
+        result[:, 2, 1] = yz + wx
+        result[:, 2, 2] = 1 - (xx + yy)
+
+        return result
+
+
+#MARK: Vector3Array
+class Vector3Array:
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        """
+        A series of vectors backed by a contiguous (N,3) array.
+        """
+        self.data = np.ascontiguousarray(data, dtype=np.float64).reshape(-1, 3)
+
+    def __str__(self) -> str:
+        return f"Vector3Array({len(self)})"
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        if dtype is None:
+            return self.data
+        return self.data.astype(dtype)
+
+    def as_array(self) -> np.ndarray:
+        return self.data
+
+    def __iter__(self):
+        for x, y, z in self.data.tolist():
+            yield Vector3(x, y, z)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return Vector3(*self.data[key].tolist())
+        return Vector3Array(self.data[key])
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.data[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.data[:, 1]
+
+    @property
+    def z(self) -> np.ndarray:
+        return self.data[:, 2]
+
+    def with_array(array) -> 'Vector3Array':
+        """
+        Initializes a series of vectors from an array.
+
+        Args:
+            array: (N,3) array of floats
+        Returns:
+            The initialized series.
+        """
+
+        return Vector3Array(array)
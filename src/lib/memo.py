@@ -0,0 +1,41 @@
+import weakref
+
+
+# id(object) -> (stamp, dict of memoised results), dropped when the object is collected
+_memos = {}
+
+
+def frame_stamp(frame) -> tuple:
+    """
+    Cheap fingerprint of a DataFrame's layout. Appending rows or adding or
+    removing columns changes it, overwriting values in place does not.
+    """
+    return (len(frame), tuple(frame.columns)) if hasattr(frame, 'columns') else ()
+
+
+def frame_memo(frame) -> dict:
+    """
+    Returns the memo dict attached to a DataFrame (or any weak
+    referenceable object). Entries live as long as the object does, and
+    are dropped when the frame's stamp changes (see frame_stamp).
+    """
+    key = id(frame)
+    stamp = frame_stamp(frame)
+    entry = _memos.get(key)
+    if entry is None:
+        entry = _memos[key] = (stamp, {})
+        weakref.finalize(frame, _memos.pop, key, None)
+    elif entry[0] != stamp:
+        entry = _memos[key] = (stamp, {})
+
+    return entry[1]
+
+
+def invalidate(frame):
+    """
+    Drops everything memoised for a frame, needed after its values are
+    overwritten in place.
+    """
+    entry = _memos.get(id(frame))
+    if entry is not None:
+        entry[1].clear()
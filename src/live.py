@@ -0,0 +1,345 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from .alignment import SYNC_MODULUS
+from .binary_log import HEADER_DTYPE, HIGHRES_DTYPE, MAGIC, is_binary_log
+from .calibration import IDLE_MARGIN, estimate_bias, scaled, parse_axis
+from .lib.integrate import integrate_gyro
+
+
+class CsvTail:
+    def __init__(self, path: str):
+        """
+        Follows a csv file that is still being written, returning only the
+        rows appended since the last read
+
+        Args:
+            path (str): The csv file
+        """
+        self.path = path
+        self.offset = 0
+        self.columns = None
+        self.remainder = b''
+
+    def read_new(self) -> pd.DataFrame | None:
+        """
+        Returns:
+            A DataFrame of the complete rows written since the last call,
+            or None when there are none
+        """
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            chunk = f.read()
+        self.offset += len(chunk)
+
+        chunk = self.remainder + chunk
+        end = chunk.rfind(b'\n') + 1
+        # keep a partially written row for the next read
+        self.remainder = chunk[end:]
+        chunk = chunk[:end]
+
+        if self.columns is None:
+            header_end = chunk.find(b'\n') + 1
+            if header_end == 0:
+                return None
+            self.columns = pd.read_csv(io.BytesIO(chunk[:header_end])).columns
+            chunk = chunk[header_end:]
+
+        if not chunk.strip():
+            return None
+
+        return pd.read_csv(io.BytesIO(chunk), header=None, names=self.columns)
+
+
+class BinaryTail:
+    def __init__(self, path: str):
+        """
+        Follows the high-res block of a binary log that is still being
+        written. The logger is expected to update highres_count in the
+        header as it flushes records.
+
+        Args:
+            path (str): The binary log
+        """
+        self.path = path
+        self.count = 0
+
+    def read_new(self) -> pd.DataFrame | None:
+        """
+        Returns:
+            A DataFrame of the high-res records flushed since the last call,
+            in data_highres.csv naming, or None when there are none
+        """
+        with open(self.path, 'rb') as f:
+            header = np.frombuffer(f.read(HEADER_DTYPE.itemsize), dtype=HEADER_DTYPE)
+            if len(header) == 0 or header[0]['magic'] != MAGIC:
+                return None
+
+            # only decode records that are fully on disk
+            f.seek(0, os.SEEK_END)
+            available = (f.tell() - HEADER_DTYPE.itemsize) // HIGHRES_DTYPE.itemsize
+            count = min(int(header[0]['highres_count']), available)
+            if count <= self.count:
+                return None
+
+            f.seek(HEADER_DTYPE.itemsize + self.count * HIGHRES_DTYPE.itemsize)
+            records = np.fromfile(f, dtype=HIGHRES_DTYPE, count=count - self.count)
+        self.count = count
+
+        columns = {'sync': records['sync']}
+        for sensor in ('accel', 'gyro', 'mag'):
+            for i, axis in enumerate('xyz'):
+                columns[f"{sensor.capitalize()}_{axis.upper()}"] = records[sensor][:, i]
+
+        return pd.DataFrame(columns)
+
+
+class LiveLog:
+    def __init__(self, path: str, args: dict):
+        """
+        Incrementally decodes a growing AV or Blue Raven log. Time,
+        scaled sensors and the integrated orientation carry their state
+        forward, so an update only processes the new records.
+
+        Args:
+            path (str): A binary log, an AV high-res csv or a Blue Raven high-res csv
+            args (dict): Command line args (axisAV, axisBR, freq, gyro_bias)
+        """
+        self.tail = BinaryTail(path) if is_binary_log(path) else CsvTail(path)
+        self.args = args
+        self.source = None
+        self.quat = (0.0, 0.0, 0.0, 1.0)
+        self.last_sync = None
+        self.last_time = 0.0
+        # gyro bias, estimated once the pre-launch idle window has passed,
+        # and the rates logged until then
+        self.bias = None
+        self.pad_gyro = []
+
+    def _time(self, df: pd.DataFrame) -> np.ndarray:
+        if self.source == 'BR':
+            return df['Flight_Time_(s)'].to_numpy(dtype=np.float64)
+
+        # unwrap the sync counter continuing from the previous update
+        sync = df['sync'].to_numpy(dtype=np.float64)
+        previous = sync[0] if self.last_sync is None else self.last_sync
+        steps = np.diff(np.concatenate([[previous], sync]))
+        steps[steps < 0] += SYNC_MODULUS
+        t = self.last_time + np.cumsum(steps) / 1000.0
+        self.last_sync = sync[-1]
+        self.last_time = t[-1]
+
+        return t
+
+    def _debias(self, t: np.ndarray, gyro: np.ndarray, dt: float, method: str) -> np.ndarray:
+        """
+        Removes the gyro bias like calibration.bias does for a whole log.
+        Rates are used as logged until a sample after the idle window
+        arrives, then the bias is estimated from the window and the
+        orientation integrated again from the start of the log without it,
+        so it matches parsing the finished log.
+
+        Returns:
+            The rates of the new records to integrate
+        """
+        if self.bias is None:
+            if np.all(t < -IDLE_MARGIN):
+                self.pad_gyro.append(gyro)
+                return gyro
+
+            pad_gyro = np.concatenate(self.pad_gyro) if self.pad_gyro else np.empty((0, 3))
+            self.bias = estimate_bias(np.concatenate([pad_gyro, gyro[t < -IDLE_MARGIN]]), self.source)
+            self.quat = tuple(integrate_gyro(pad_gyro - self.bias, dt, method=method)[-1])
+            self.pad_gyro = None
+
+        return gyro - self.bias
+
+    def update(self) -> dict | None:
+        """
+        Decodes any new records.
+
+        Returns:
+            A dict of 't', 'accel' (vertical, m/s^2), 'gyro' ((n,3) degrees/s)
+            and 'tilt' (degrees) arrays for the new records, or None
+        """
+        df = self.tail.read_new()
+        if df is None or len(df) == 0:
+            return None
+
+        if self.source is None:
+            self.source = 'BR' if 'Flight_Time_(s)' in df else 'AV'
+
+        if self.source == 'BR':
+            axis, freq = self.args['axisBR'], self.args['freq'].split(':')[1]
+        else:
+            axis, freq = self.args['axisAV'], self.args['freq'].split(':')[0]
+
+        dt = 1/int(freq)
+        method = self.args.get('integrator', 'half_euler')
+        t = self._time(df)
+
+        gyro = scaled(df, self.source, 'gyro', *parse_axis(axis))
+        if self.args.get('gyro_bias', False):
+            gyro = self._debias(t, gyro, dt, method)
+
+        # reads end at arbitrary samples, so live updates are never decimated
+        quats = integrate_gyro(gyro, dt, initial=self.quat, method=method)[1:]
+        self.quat = tuple(quats[-1])
+
+        tilt_cosine = 1 - 2 * (quats[:, 0]**2 + quats[:, 1]**2)
+
+        return {
+            't': t,
+            # logged x axis is vertical for both sources
+            'accel': scaled(df, self.source, 'accel')[:, 2],
+            'gyro': scaled(df, self.source, 'gyro'),
+            'tilt': np.degrees(np.arccos(np.clip(tilt_cosine, -1.0, 1.0))),
+        }
+
+
+class StreamingDecimator:
+    def __init__(self, max_bins: int = 1000):
+        """
+        Keeps a min/max reduction of a series that only grows. Samples
+        are folded into fixed size bins, and bins are merged in pairs when
+        there are more than max_bins, so memory and the number of points
+        drawn stay bounded however long the series gets.
+
+        Args:
+            max_bins (int): Upper bound on the number of bins kept
+        """
+        self.max_bins = max_bins
+        self.bin_size = 1
+        # per bin: (x of min, min, x of max, max)
+        self.bins = np.empty((0, 4))
+        self.pending_x = np.empty(0)
+        self.pending_y = np.empty(0)
+
+    def _reduce(self, x: np.ndarray, y: np.ndarray, size: int) -> np.ndarray:
+        count = len(y) // size
+        xs = x[:count * size].reshape(count, size)
+        ys = y[:count * size].reshape(count, size)
+        rows = np.arange(count)
+        lo = np.argmin(ys, axis=1)
+        hi = np.argmax(ys, axis=1)
+
+        return np.column_stack([xs[rows, lo], ys[rows, lo], xs[rows, hi], ys[rows, hi]])
+
+    def extend(self, x: np.ndarray, y: np.ndarray):
+        """
+        Adds new samples, cost scales with the number of samples added.
+        """
+        x = np.concatenate([self.pending_x, x])
+        y = np.concatenate([self.pending_y, y])
+
+        complete = len(y) // self.bin_size * self.bin_size
+        if complete:
+            self.bins = np.concatenate([self.bins, self._reduce(x, y, self.bin_size)])
+        self.pending_x = x[complete:]
+        self.pending_y = y[complete:]
+
+        while len(self.bins) > self.max_bins:
+            self._merge()
+
+    def _merge(self):
+        # fold pairs of bins, an odd bin out waits as pending samples
+        count = len(self.bins) // 2 * 2
+        pairs = self.bins[:count].reshape(-1, 2, 4)
+        lo = np.where(pairs[:, 0, 1] <= pairs[:, 1, 1], 0, 1)
+        hi = np.where(pairs[:, 0, 3] >= pairs[:, 1, 3], 0, 1)
+        rows = np.arange(len(pairs))
+        merged = np.column_stack([
+            pairs[rows, lo, 0], pairs[rows, lo, 1],
+            pairs[rows, hi, 2], pairs[rows, hi, 3]
+        ])
+
+        if count < len(self.bins):
+            odd = self.bins[count]
+            order = np.argsort([odd[0], odd[2]])
+            self.pending_x = np.concatenate([np.array([odd[0], odd[2]])[order], self.pending_x])
+            self.pending_y = np.concatenate([np.array([odd[1], odd[3]])[order], self.pending_y])
+
+        self.bins = merged
+        self.bin_size *= 2
+
+    def data(self) -> tuple:
+        """
+        Returns:
+            The (x, y) points to draw, in x order
+        """
+        first = self.bins[:, 0] <= self.bins[:, 2]
+        x = np.where(first[:, None], self.bins[:, [0, 2]], self.bins[:, [2, 0]]).ravel()
+        y = np.where(first[:, None], self.bins[:, [1, 3]], self.bins[:, [3, 1]]).ravel()
+
+        return np.concatenate([x, self.pending_x]), np.concatenate([y, self.pending_y])
+
+
+def live(args: dict):
+    """
+    Opens a window that follows a growing log, refreshing at most every
+    args['refresh_ms'] milliseconds
+    """
+    import tkinter as tk
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+
+    log = LiveLog(args['live'], args)
+    refresh_ms = int(args.get('refresh_ms', 250))
+
+    root = tk.Tk()
+    root.title(f"Live: {os.path.basename(args['live'])}")
+    root.protocol("WM_DELETE_WINDOW", root.quit)
+
+    plt.rcParams['font.size'] = 7
+    fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(6, 6), dpi=80, sharex=True)
+    ax1.set_ylabel('Vertical acceleration (m/s^2)')
+    ax2.set_ylabel('Rotational velocity (deg/s)')
+    ax3.set_ylabel('Tilt (degrees)')
+    ax3.set_xlabel('Time (s)')
+
+    series = {
+        'accel': [(ax1, StreamingDecimator(), ax1.plot([], [])[0])],
+        'gyro': [(ax2, StreamingDecimator(), ax2.plot([], [], label=label)[0]) for label in "XYZ"],
+        'tilt': [(ax3, StreamingDecimator(), ax3.plot([], [])[0])],
+    }
+    ax2.legend(loc="upper right")
+    limits = {ax: [np.inf, -np.inf] for ax in (ax1, ax2, ax3)}
+    t_range = [np.inf, -np.inf]
+
+    fig.tight_layout()
+    canvas = FigureCanvasTkAgg(fig, master=root)
+    toolbar = NavigationToolbar2Tk(canvas, root)
+    toolbar.update()
+    canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+    toolbar.pack(side=tk.BOTTOM, fill=tk.X)
+
+    def refresh():
+        new = log.update()
+        if new is not None:
+            t = new['t']
+            t_range[0] = min(t_range[0], t[0])
+            t_range[1] = max(t_range[1], t[-1])
+
+            for name, lines in series.items():
+                values = new[name].reshape(len(t), -1)
+                for i, (ax, decimator, line) in enumerate(lines):
+                    decimator.extend(t, values[:, i])
+                    line.set_data(*decimator.data())
+                    # running limits avoid rescanning the whole line
+                    limits[ax][0] = min(limits[ax][0], values[:, i].min())
+                    limits[ax][1] = max(limits[ax][1], values[:, i].max())
+
+            for ax, (low, high) in limits.items():
+                margin = 0.05 * (high - low) or 1.0
+                ax.set_ylim(low - margin, high + margin)
+            ax3.set_xlim(t_range[0], max(t_range[1], t_range[0] + 1e-3))
+            canvas.draw_idle()
+
+        root.after(refresh_ms, refresh)
+
+    root.after(0, refresh)
+    root.mainloop()
+    root.destroy()
@@ -0,0 +1,111 @@
+import os
+
+import pandas as pd
+
+from .parse_data import parse_data
+from .binary_log import MAGIC, BinaryLog, is_binary_log
+from .cache import DataCache
+from .datasets import DATASETS, FlightData, resolve
+from .schema import SCHEMA_VERSION, read_csv as read_schema_csv
+from . import instrument
+
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data_csv')
+
+# datasets a binary log replaces the csv files of
+BINARY_DATASETS = ('highres', 'lowres', 'highres_2')
+
+# args that change the parsed data, used to key the cache, and their
+# defaults so args left out share entries with the command line's
+CACHE_ARGS = {
+    'axisAV': None,
+    'axisBR': None,
+    'freq': None,
+    'gyro_bias': False,
+    'integrator': 'half_euler',
+    'decimate': 1,
+}
+
+
+def get_data(args: dict, requires: dict | None = None) -> FlightData:
+    """
+    Get data from the binary log at args['data'], or from the csv files in
+    data_csv (or args['data_dir']) when no log is given.
+    Csv files are pruned to their schema unless args['prune'] is False.
+
+    Args:
+        args (dict): Command line args
+        requires (dict | None): Merged requirements of the analyses that
+            will run (see datasets.merge_requirements), only these datasets,
+            columns and products are loaded. None loads everything.
+    Returns:
+        The FlightData
+    """
+    with instrument.span("get_data"):
+        return _get_data(args, requires)
+
+
+def _get_data(args: dict, requires: dict | None) -> FlightData:
+    data_csv_dir = args.get('data_dir') or DEFAULT_DATA_DIR
+
+    path = args.get('data')
+    binary = path is not None
+    # a mistyped path or another logger's file must not show the bundled flight
+    if binary and not is_binary_log(path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No binary log at {path}")
+        raise ValueError(f"{path} is not a binary log (no {MAGIC.decode()} header), see binary_log.HEADER_DTYPE")
+    datasets, products = resolve(requires, binary)
+
+    # Blue Raven data always comes from its own csv export
+    csv_names = [name for name in datasets if not (binary and name in BINARY_DATASETS)]
+    sources = {name: os.path.join(data_csv_dir, DATASETS[name]) for name in csv_names}
+    if binary and any(name in datasets for name in BINARY_DATASETS):
+        sources['binary'] = path
+
+    prune = args.get('prune', True)
+    cache = DataCache.from_args(args)
+
+    key = None
+    if args.get('cache', True):
+        params = {k: args.get(k, default) for k, default in CACHE_ARGS.items()}
+        params['schema'] = SCHEMA_VERSION if prune else None
+        if requires is not None:
+            params['datasets'] = datasets
+            params['products'] = sorted(products)
+        key = cache.key([sources[name] for name in sorted(sources)], params)
+        with instrument.span("cache.load"):
+            data = cache.load(key)
+        if data is not None:
+            return FlightData(data)
+
+    data = FlightData()
+    if 'binary' in sources:
+        with instrument.span("binary_log.read", path=sources['binary']):
+            log = BinaryLog(sources['binary'])
+            if 'highres' in datasets:
+                data['highres'] = log.highres_frame(capitalise=True)
+            if 'lowres' in datasets:
+                data['lowres'] = log.lowres_frame()
+            if 'highres_2' in datasets:
+                data['highres_2'] = log.highres_frame()
+
+    for name in csv_names:
+        data[name] = read_csv(sources[name], prune, datasets[name])
+
+    # keep the usual dataset order
+    data = FlightData({name: data[name] for name in DATASETS if name in data})
+
+    with instrument.span("parse_data"):
+        parse_data(data, args, products)
+
+    if key is not None:
+        with instrument.span("cache.store"):
+            cache.store(key, data)
+
+    return data
+
+
+def read_csv(path: str, prune: bool = True, columns: tuple | None = None) -> pd.DataFrame:
+    with instrument.span("read_csv", path=os.path.basename(path)):
+        return read_schema_csv(path, prune, columns)
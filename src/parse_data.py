@@ -1,71 +1,58 @@
 import pandas as pd
 
-from .lib.math import Quaternion, Vector3
+from .calibration import scaled, parse_axis
+from .datasets import PRODUCTS, TILT_DATASETS
+from .derived import derived
+from .lib.integrate import integrate_gyro, upsample
 
 
-def parse_data(data: list, args: dict):
+def parse_data(data: dict, args: dict, products: set | None = None):
     """
     general data parsing for data used in multiple places
+
+    Args:
+        data (dict): FlightData, products are added to it
+        args (dict): Command line args
+        products (set | None): Names of the products to derive (see
+            datasets.PRODUCTS), None for all of them
     """
+    products = set(PRODUCTS) if products is None else products
 
     # MARK: quaternions (rotation and tilt)
 
-    data_AV = data[0]
-    data_BR = data[1]
-
-    def calculate_quat(gyro, dt):
-        quats = [Quaternion(0, 0, 0, 1)]
-        for i in range(len(gyro[0])):
-            gyro_x = gyro[0][i]
-            gyro_y = gyro[1][i]
-            gyro_z = gyro[2][i]
+    # pad offsets are removed before integrating when asked, see calibration.bias
+    debias = args.get('gyro_bias', False)
 
-            q_dot = Quaternion.with_half_euler(
-                dt * (gyro_x),
-                dt * (gyro_y),
-                dt * (gyro_z)
-            )
+    # estimates, integrated every decimate'th sample and filled back in
+    method = args.get('integrator', 'half_euler')
+    decimate = args.get('decimate', 1)
 
-            q_w = quats[i].multiply(q_dot)
-            quats.append(q_w.normalise())
+    if 'quaternions_AV' in products:
+        # Rotate AV data to global frame
+        gyro_AV = scaled(data['highres'], 'AV', 'gyro', *parse_axis(args['axisAV']), debias=debias)
 
-        return quats
+        freq = int(args['freq'].split(':')[0])
+        dt = 1/freq
+        quats_AV = integrate_gyro(gyro_AV, dt, method=method, decimate=decimate)
+        quats_AV = upsample(quats_AV, decimate, len(gyro_AV))
 
-    # Rotate AV data to global frame
-    ax_AV = args['axisAV'][:3]
-    scale = Vector3.with_array(list(map(
-        float, args['axisAV'][4:-1].split(',')
-    )))
-    sens = 13.375
-    gyro_AV = [
-        [scale.x * x / sens for x in data_AV[f'Gyro_{str(ax_AV[0]).upper()}']],
-        [scale.y * y / sens for y in data_AV[f'Gyro_{str(ax_AV[1]).upper()}']],
-        [scale.z * z / sens for z in data_AV[f'Gyro_{str(ax_AV[2]).upper()}']],
-    ]
+        data['quaternions_AV'] = pd.DataFrame(quats_AV, columns=["x", "y", "z", "w"])
 
-    # Rotate BR data to global frame
-    ax_BR = args['axisBR'][:3]
-    scale = Vector3.with_array(list(map(
-        float, args['axisBR'][4:-1].split(',')
-    )))
+        # MARK: tilt (binary logs carry no precomputed tilt)
 
-    gyro_BR = [
-        [scale.x * x for x in data_BR[f'Gyro_{str(ax_BR[0]).upper()}']],
-        [scale.y * y for y in data_BR[f'Gyro_{str(ax_BR[1]).upper()}']],
-        [scale.z * z for z in data_BR[f'Gyro_{str(ax_BR[2]).upper()}']]
-    ]
+        for name in TILT_DATASETS:
+            df = data.get(name)
+            if df is not None and 'Tilt_Cosine' not in df and len(df) == len(quats_AV) - 1:
+                df['Tilt_(degrees)'] = derived(data['quaternions_AV'], 'tilt')[1:]
+                df['Tilt_Cosine'] = derived(data['quaternions_AV'], 'tilt_cosine')[1:]
 
-    # estimates
-    freq = int(args['freq'].split(':')[1])
-    dt = 1/freq
-    quats_BR = list(map(Quaternion.as_array, calculate_quat(gyro_BR, dt)))
-    
-    freq = int(args['freq'].split(':')[0])
-    dt = 1/freq
-    quats_AV = list(map(Quaternion.as_array, calculate_quat(gyro_AV, dt)))
+    if 'quaternions_BR' in products:
+        # Rotate BR data to global frame
+        gyro_BR = scaled(data['raven_highres'], 'BR', 'gyro', *parse_axis(args['axisBR']), debias=debias)
 
-    df_quats_AV = pd.DataFrame(quats_AV, columns=["x", "y", "z", "w"])
-    df_quats_BR = pd.DataFrame(quats_BR, columns=["x", "y", "z", "w"])
+        freq = int(args['freq'].split(':')[1])
+        dt = 1/freq
+        quats_BR = integrate_gyro(gyro_BR, dt, method=method, decimate=decimate)
+        quats_BR = upsample(quats_BR, decimate, len(gyro_BR))
 
-    data.append(df_quats_AV)
-    data.append(df_quats_BR)
\ No newline at end of file
+        data['quaternions_BR'] = pd.DataFrame(quats_BR, columns=["x", "y", "z", "w"])
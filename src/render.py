@@ -0,0 +1,127 @@
+import matplotlib
+matplotlib.use('Agg')
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+# importing the graphs registers their tabs
+from . import graphs  # noqa: F401
+from .graph_tab import TABS
+from .datasets import merge_requirements
+from .loader import get_data
+from . import instrument
+
+
+FORMATS = ('png', 'svg', 'pdf')
+DEFAULT_DPI = 150
+
+# datasets and args shared by every figure in a worker process
+_worker_data = None
+_worker_args = None
+
+
+def _init_worker(data: dict, args: dict, profile: tuple | None = None):
+    global _worker_data, _worker_args
+    instrument.init_worker(profile)
+    _worker_data = data
+    _worker_args = args
+
+
+def render_tab(name: str, data: dict, args: dict, output_dir: str, formats: tuple = ('png',), dpi: float = DEFAULT_DPI) -> list:
+    """
+    Computes and draws one tab without a window and saves its figure.
+
+    Args:
+        name (str): Tab name, see graph_tab.TABS
+        data (dict): FlightData with at least the tab's requirements
+        args (dict): Command line args
+        output_dir (str): Directory the figure is saved in, as <name>.<format>
+        formats (tuple): Any of FORMATS
+        dpi (float): Resolution of the figure, line decimation follows it
+    Returns:
+        The paths written
+    """
+    cls, options = TABS[name]
+    tab = cls(data, args, **options)
+
+    with instrument.span(f"{tab.title}.render_file"):
+        FigureCanvasAgg(tab.create_figure(dpi))
+        tab.graph()
+
+        paths = []
+        for fmt in formats:
+            path = os.path.join(output_dir, f"{name}.{fmt}")
+            tab.fig.savefig(path, format=fmt)
+            paths.append(path)
+
+    return paths
+
+
+def _render(name: str, output_dir: str, formats: tuple, dpi: float) -> dict:
+    start = time.perf_counter()
+    try:
+        paths = render_tab(name, _worker_data, _worker_args, output_dir, formats, dpi)
+        status = 'ok'
+    except Exception as e:
+        # one broken analysis should not lose the rest of the report
+        paths = []
+        status = f"error: {type(e).__name__}: {e}"
+
+    return {'tab': name, 'status': status, 'paths': paths, 'seconds': time.perf_counter() - start, 'events': instrument.collect()}
+
+
+def render_report(args: dict) -> list:
+    """
+    Draws every tab (or args['tabs']) to image files with the Agg
+    backend, one figure per worker process, so a report takes about as
+    long as its slowest figure. The data the tabs need is loaded once and
+    sent to each worker.
+
+    Args:
+        args (dict): Command line args, with output_dir, formats and dpi
+    Returns:
+        A result dict (tab, status, paths, seconds) per tab, in tab order
+    """
+    names = args.get('tabs') or list(TABS)
+    unknown = [name for name in names if name not in TABS]
+    if unknown:
+        raise SystemExit(f"Unknown tab(s) {', '.join(unknown)}, choose from {', '.join(TABS)}")
+
+    formats = tuple(args.get('formats') or ('png',))
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if unknown:
+        raise SystemExit(f"Unknown format(s) {', '.join(unknown)}, choose from {', '.join(FORMATS)}")
+
+    output_dir = args.get('output_dir') or './figures'
+    os.makedirs(output_dir, exist_ok=True)
+    dpi = args.get('dpi') or DEFAULT_DPI
+
+    start = time.perf_counter()
+    data = get_data(args, merge_requirements(*(TABS[name][0].requirements(**TABS[name][1]) for name in names)))
+
+    workers = max(1, min(args.get('workers') or os.cpu_count() or 1, len(names)))
+    # the pool already uses the cores, and the cache was cleared by get_data
+    worker_args = dict(args, workers=1, clear_cache=False)
+
+    results = {}
+    if workers == 1:
+        _init_worker(data, worker_args)
+        for name in names:
+            results[name] = _render(name, output_dir, formats, dpi)
+            results[name].pop('events')
+            print(f"{name}: {results[name]['status']} ({results[name]['seconds']:.2f} s)")
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(data, worker_args, instrument.worker_state())) as pool:
+            futures = [pool.submit(_render, name, output_dir, formats, dpi) for name in names]
+            for future in as_completed(futures):
+                result = future.result()
+                instrument.merge(result.pop('events'))
+                results[result['tab']] = result
+                print(f"{result['tab']}: {result['status']} ({result['seconds']:.2f} s)")
+
+    rendered = sum(result['status'] == 'ok' for result in results.values())
+    print(f"\n{rendered}/{len(names)} figures written to {output_dir} in {time.perf_counter() - start:.2f} s")
+
+    return [results[name] for name in names]
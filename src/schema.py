@@ -0,0 +1,79 @@
+import os
+
+import pandas as pd
+
+
+# Bump when a schema changes, it is part of the parsed data cache key
+SCHEMA_VERSION = 1
+
+
+def _axes(prefix: str, dtype: str, upper: bool = True) -> dict:
+    return {f"{prefix}_{axis.upper() if upper else axis}": dtype for axis in 'xyz'}
+
+
+# csv file -> the columns the app reads and their narrowest dtypes. Raw
+# sensor counts are int16 LSB and derived values float32. Times stay
+# float64, float32 only resolves milliseconds to about 65 s.
+SCHEMAS = {
+    'data_highres.csv': {
+        'sync': 'uint8',
+        **_axes('Accel', 'int16'),
+        **_axes('Gyro', 'int16'),
+        **_axes('Mag', 'int16'),
+        'Tilt_(degrees)': 'float32',
+        'Tilt_Cosine': 'float32',
+    },
+    'data_highres_2.csv': {
+        'sync': 'uint8',
+        **_axes('accel', 'int16', upper=False),
+        **_axes('gyro', 'int16', upper=False),
+        **_axes('mag', 'int16', upper=False),
+        'Tilt_(degrees)': 'float32',
+        'Tilt_Cosine': 'float32',
+    },
+    'data_lowres.csv': {
+        'sync': 'uint8',
+        'pressure': 'int32',
+        'temperature': 'int16',
+    },
+    'data_raven_highres.csv': {
+        'Flight_Time_(s)': 'float64',
+        'Sync': 'uint8',
+        **_axes('Gyro', 'float32'),
+        **_axes('Accel', 'float32'),
+        'Quat_1': 'float32',
+        'Quat_2': 'float32',
+        'Quat_3': 'float32',
+        'Quat_4': 'float32',
+    },
+    'data_raven_lowres.csv': {
+        'Flight_Time_(s)': 'float64',
+        'Sync': 'uint8',
+        'Baro_Altitude_AGL_(feet)': 'float32',
+        'Velocity_Up': 'float32',
+    },
+}
+
+
+def read_csv(path: str, prune: bool = True, columns: tuple | None = None) -> pd.DataFrame:
+    """
+    Reads a data csv, keeping only the columns in its schema at their
+    declared dtypes. Files without a schema, or prune=False, are read in
+    full as before.
+
+    Args:
+        path (str): The csv file
+        prune (bool): Apply the schema for the file's name
+        columns (tuple | None): Only read these of the schema's columns
+    Returns:
+        The DataFrame
+    """
+    schema = SCHEMAS.get(os.path.basename(path)) if prune else None
+    if schema is None:
+        return pd.read_csv(path)
+
+    if columns is not None:
+        schema = {column: dtype for column, dtype in schema.items() if column in columns}
+
+    # a callable tolerates files that are missing some schema columns
+    return pd.read_csv(path, usecols=lambda column: column in schema, dtype=schema)
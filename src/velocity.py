@@ -0,0 +1,85 @@
+import numpy as np
+
+from .alignment import timebase, resample
+from .calibration import scaled, G, FEET_PER_METRE
+from .lib.kalman import kalman_filter
+from .kalman_tuning import tune_kalman
+from .cache import DataCache
+from .datasets import axis_columns
+
+
+# datasets and columns kalman_velocity reads
+REQUIRES = {
+    'highres_2': ('sync', 'Tilt_Cosine', *axis_columns('accel', upper=False)),
+    'raven_lowres': ('Flight_Time_(s)', 'Baro_Altitude_AGL_(feet)', 'Velocity_Up'),
+}
+
+
+def kalman_velocity(data: dict, args: dict) -> dict:
+    """
+    Vertical velocity from a Kalman filter over the AV acceleration and the
+    Blue Raven barometric altitude, tuned against the Blue Raven velocity.
+    Needs no GUI, so headless commands can use it.
+
+    Args:
+        data (dict): FlightData with at least REQUIRES
+        args (dict): Command line args
+    Returns:
+        A dict of 't', 'velocity', 't_br', 'velocity_br' and the filter 'params'
+    """
+    data_br_l = data['raven_lowres']
+    data = data['highres_2']
+
+    # Constants and data preparation
+    dt = 0.004 # Time interval between measurements
+
+    t = timebase(data)
+    t_br_l = timebase(data_br_l)
+
+    # vertical (logged x) acceleration
+    accel_x = scaled(data, 'AV', 'accel')[:, 2]
+
+    cosines = data["Tilt_Cosine"]
+
+    # Blue Raven channels on the AV clock
+    baro = resample(data_br_l, "Baro_Altitude_AGL_(feet)", data)
+    vel_br = resample(data_br_l, "Velocity_Up", data)
+
+    # Altitude and acceleration measurements
+    z = np.column_stack([
+        baro,
+        FEET_PER_METRE * (cosines.to_numpy() * accel_x - G)
+    ])
+
+    p_bounds = {
+        'q0': (0.001, 100), 'q1': (0.001, 100), 'q2': (0.001, 100),
+        'r0': (0.001, 100), 'r1': (0.001, 100)
+    }
+
+    p = tune_kalman(
+        z, vel_br, dt, p_bounds,
+        skip=2890, init_points=5, n_iter=10, random_state=1,
+        workers=args.get('workers'),
+        cache=DataCache.from_args(args) if args.get('cache', True) else None
+    )
+
+    x_est, _ = kalman_filter(
+        z, dt,
+        (p['q0'], p['q1'], p['q2']),
+        (p['r0'], p['r1']),
+        covariance=False
+    )
+
+    estimated_velocities = x_est[:, 1]
+
+    # Truncate filter parameters for plot text
+    for k, v in p.items():
+        p[k] = round(v, 3)
+
+    return {
+        't': t,
+        'velocity': estimated_velocities,
+        't_br': t_br_l,
+        'velocity_br': data_br_l["Velocity_Up"].to_numpy(),
+        'params': p,
+    }